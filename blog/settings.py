@@ -86,9 +86,24 @@ DATABASES = {
 'default': env.db('DJANGO_DB_URL')
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Counts and responses are shared between workers, point this at Redis or Memcached in production
+
+CACHES = {
+'default': env.cache('DJANGO_CACHE_URL', default='locmemcache://')
+}
+
 # Use custom user model
 AUTH_USER_MODEL = 'user.CustomUser'
 
+# Session users are resolved from a cached principal; ModelBackend stays listed
+# so that sessions opened before the switch remain valid
+AUTHENTICATION_BACKENDS = [
+    'user.backends.CachedPrincipalBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -123,7 +138,14 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',
+        'user.authentication.BearerTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ),
+    # JSON first, so that it stays the default
+    'DEFAULT_RENDERER_CLASSES': [
+        'post.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'post.renderers.MessagePackRenderer',
+    ],
 }
 
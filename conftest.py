@@ -0,0 +1,10 @@
+import pytest
+from django.core.cache import cache
+
+
+# Cached counts and responses must not leak between tests
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
@@ -0,0 +1,106 @@
+from .models import Post, PostAudience
+
+READ_ONLY = 1
+
+PUBLIC = 'public'
+AUTHENTICATED = 'authenticated'
+
+# Number of posts rewritten per statement when rebuilding the index
+BATCH_SIZE = 1000
+
+
+def team_key(team_id):
+    # Users without a team share the posts of team-less authors, same as author__team=None
+    return f'team:{team_id}' if team_id is not None else 'team:none'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+# Audience keys that can read a post, mirroring PostPermissions.has_read_access
+def audience_keys_for_post(author_id, author_team_id, public_permission, authenticated_permission, team_permission):
+    keys = {user_key(author_id)}
+    if public_permission:
+        keys.add(PUBLIC)
+    if authenticated_permission >= READ_ONLY:
+        keys.add(AUTHENTICATED)
+    if team_permission >= READ_ONLY:
+        keys.add(team_key(author_team_id))
+    return keys
+
+
+# Audience keys a user belongs to (admins bypass the index entirely)
+def audience_keys_for_user(user):
+    if not user or not user.is_authenticated:
+        return [PUBLIC]
+    return [PUBLIC, AUTHENTICATED, team_key(user.team_id), user_key(user.pk)]
+
+
+def sync_post_audiences(post, created=False):
+    wanted = audience_keys_for_post(
+        post.author_id,
+        post.author.team_id,
+        post.public_permission,
+        post.authenticated_permission,
+        post.team_permission,
+    )
+    current = set() if created else set(
+        PostAudience.objects.filter(post=post).values_list('key', flat=True)
+    )
+
+    stale = current - wanted
+    if stale:
+        PostAudience.objects.filter(post=post, key__in=stale).delete()
+    missing = wanted - current
+    if missing:
+        PostAudience.objects.bulk_create([PostAudience(post=post, key=key) for key in missing])
+    return current, wanted
+
+
+# Re-key the team audience of every team-visible post written by the given authors
+def sync_author_audiences(author_ids):
+    posts = (
+        Post.objects.filter(author_id__in=author_ids, team_permission__gte=READ_ONLY)
+        .values_list('id', 'author__team_id')
+        .order_by('id')
+    )
+    for batch in batches(posts.iterator(chunk_size=BATCH_SIZE)):
+        post_ids = [post_id for post_id, _ in batch]
+        PostAudience.objects.filter(post_id__in=post_ids, key__startswith='team:').delete()
+        PostAudience.objects.bulk_create([
+            PostAudience(post_id=post_id, key=team_key(team_id)) for post_id, team_id in batch
+        ])
+
+
+# Recompute the index for every post, e.g. after bulk updates that bypassed signals
+def rebuild_post_audiences(queryset=None):
+    queryset = Post.objects.all() if queryset is None else queryset
+    posts = queryset.values_list(
+        'id', 'author_id', 'author__team_id',
+        'public_permission', 'authenticated_permission', 'team_permission',
+    ).order_by('id')
+
+    rebuilt = 0
+    for batch in batches(posts.iterator(chunk_size=BATCH_SIZE)):
+        post_ids = [row[0] for row in batch]
+        PostAudience.objects.filter(post_id__in=post_ids).delete()
+        PostAudience.objects.bulk_create([
+            PostAudience(post_id=row[0], key=key)
+            for row in batch
+            for key in audience_keys_for_post(*row[1:])
+        ])
+        rebuilt += len(batch)
+    return rebuilt
+
+
+# Lists of up to BATCH_SIZE rows, read lazily from any iterable
+def batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,239 @@
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections, transaction
+
+# Exact counts are also bounded in time in case a write bypasses the versions
+COUNT_TIMEOUT = 60 * 5
+POST_DETAIL_TIMEOUT = 60 * 5
+# Anonymous list pages are fresh for PUBLIC_LIST_FRESH seconds, then served
+# stale while a single request rebuilds them
+PUBLIC_LIST_FRESH = 30
+PUBLIC_LIST_TIMEOUT = 60 * 10
+PUBLIC_LIST_REBUILD_TIMEOUT = 10
+PUBLIC_LIST_PARAMS = {'page', 'page_size', 'fields', 'mode'}
+
+
+# Every write to a model bumps its version, which retires every cache entry
+# built from it. Missing versions start from the clock so that an evicted
+# version can never bring an old namespace back.
+def _version_key(model):
+    return f'version:{model._meta.label_lower}'
+
+
+def _get_versions(keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns())
+            versions[key] = cache.get(key)
+    return tuple(versions[key] for key in keys)
+
+
+def get_versions(*models):
+    return _get_versions([_version_key(model) for model in models])
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns())
+
+
+def bump_versions(*models):
+    keys = [_version_key(model) for model in models]
+    _bump(keys)
+    # Bump again once the write is visible, so readers of the old rows that
+    # cached in between are retired as well
+    transaction.on_commit(lambda: _bump(keys))
+
+
+# Like and comment counters of posts change with every like and comment. They
+# have their own version, so that cached counts, keyed by the Post version, are
+# only retired when posts are created, deleted or change audience.
+POST_COUNTERS_KEY = 'version:post_counters'
+
+
+def bump_post_counters():
+    _bump([POST_COUNTERS_KEY])
+    transaction.on_commit(lambda: _bump([POST_COUNTERS_KEY]))
+
+
+# Versions of the models shown in a list, plus the post counters it displays
+def get_list_versions(*models):
+    return _get_versions([_version_key(model) for model in models] + [POST_COUNTERS_KEY])
+
+
+# Posts also have a version each, bumped when that post or its counters change
+def _post_version_key(pk):
+    return f'version:post:{pk}'
+
+
+def post_version(pk):
+    return _get_versions([_post_version_key(pk)])[0]
+
+
+def bump_post_versions(post_ids):
+    keys = [_post_version_key(pk) for pk in post_ids]
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def _queryset_digest(queryset, *extra):
+    sql, params = queryset.query.sql_with_params()
+    return hashlib.sha1(repr((sql, params) + extra).encode()).hexdigest()
+
+
+# Exact count cached per query (which covers the caller's audience and filters)
+def cached_count(queryset):
+    from .models import Post
+
+    try:
+        digest = _queryset_digest(queryset.order_by(), get_versions(queryset.model, Post))
+    except EmptyResultSet:
+        return 0
+    key = f'count:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_TIMEOUT)
+    return count
+
+
+# Row estimate from the PostgreSQL planner statistics, None where unavailable
+def estimated_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+# Serialized post detail along with what the per-caller access check needs.
+# The key is taken before the post is read, so a concurrent write retires the
+# entry; the author's version is checked on every hit since their team and
+# username are part of it.
+def post_detail_key(pk):
+    return f'post_detail:{pk}:{post_version(pk)}'
+
+
+def get_post_detail(key):
+    from user.principals import principal_version
+
+    entry = cache.get(key)
+    if entry is not None and entry['author_version'] != principal_version(entry['access']['author_id']):
+        entry = None
+    _count_lookup('hits' if entry is not None else 'misses')
+    return entry
+
+
+def set_post_detail(key, post, data, etag, last_modified):
+    from user.principals import principal_version
+
+    access = {
+        'author_id': post.author_id,
+        'author_team_id': post.author.team_id,
+        'public_permission': post.public_permission,
+        'authenticated_permission': post.authenticated_permission,
+        'team_permission': post.team_permission,
+    }
+    entry = {
+        'data': dict(data), 'access': access, 'author_version': principal_version(post.author_id),
+        'etag': etag, 'last_modified': last_modified,
+    }
+    cache.set(key, entry, POST_DETAIL_TIMEOUT)
+
+
+def _count_lookup(outcome):
+    key = f'post_detail:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def post_detail_stats():
+    counts = cache.get_many(['post_detail:hits', 'post_detail:misses'])
+    hits, misses = counts.get('post_detail:hits', 0), counts.get('post_detail:misses', 0)
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses) if hits + misses else None}
+
+
+def reset_post_detail_stats():
+    cache.delete_many(['post_detail:hits', 'post_detail:misses'])
+
+
+# Rendered pages of the anonymous post list, shared by every anonymous caller.
+# Any change to a public post moves the generation, which makes cached pages
+# stale; a post that stops being public (or is deleted) moves the revoked
+# generation as well, and pages built before that are never served again.
+PUBLIC_GENERATION_KEY = 'version:public_posts'
+PUBLIC_REVOKED_KEY = 'version:public_posts_revoked'
+
+
+def bump_public_posts(revoked=False):
+    keys = [PUBLIC_GENERATION_KEY, PUBLIC_REVOKED_KEY] if revoked else [PUBLIC_GENERATION_KEY]
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+# None when the request is not a plain anonymous JSON page
+def public_list_key(request):
+    if request.user.is_authenticated or set(request.query_params) - PUBLIC_LIST_PARAMS:
+        return None
+    if request.accepted_renderer.format != 'json':
+        return None
+    params = [(name, request.query_params.get(name, '')) for name in sorted(PUBLIC_LIST_PARAMS)]
+    # Links in the page are absolute, so the host is part of the key
+    url = f'{request.scheme}://{request.get_host()}?{params}'
+    return f'public_posts:{hashlib.sha1(url.encode()).hexdigest()}'
+
+
+# The cached page and whether it is 'fresh' or 'stale', or (None, None)
+def get_public_list(key):
+    entry = cache.get(key)
+    if entry is None:
+        return None, None
+    generation, revoked = _get_versions([PUBLIC_GENERATION_KEY, PUBLIC_REVOKED_KEY])
+    if entry['revoked'] != revoked:
+        return None, None
+    if entry['generation'] == generation and entry['expires'] > time.time():
+        return entry, 'fresh'
+    return entry, 'stale'
+
+
+def public_list_generations():
+    return _get_versions([PUBLIC_GENERATION_KEY, PUBLIC_REVOKED_KEY])
+
+
+def set_public_list(key, generations, response):
+    cache.set(key, {
+        'generation': generations[0],
+        'revoked': generations[1],
+        'expires': time.time() + PUBLIC_LIST_FRESH,
+        'body': response.content,
+        'content_type': response['Content-Type'],
+        'etag': response['ETag'],
+    }, PUBLIC_LIST_TIMEOUT)
+
+
+# Only one request rebuilds a stale page, the others keep serving it
+def claim_public_list_rebuild(key):
+    return cache.add(f'{key}:rebuild', 1, PUBLIC_LIST_REBUILD_TIMEOUT)
+
+
+def release_public_list_rebuild(key):
+    cache.delete(f'{key}:rebuild')
@@ -0,0 +1,102 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+from user.models import CustomUser
+from .caching import get_list_versions, get_versions, post_version
+from .models import Post
+from .readers import compiled_reader
+from .serializers import PostSerializer
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+# Everything a post body shows, without serializing it
+def post_etag(post):
+    return make_etag(
+        post.pk, post.updated_at, post.activity_at, post.like_count, post.comment_count, post.author.username,
+    )
+
+
+# Other representations of the same post (sparse fields, excerpt, MessagePack) get their own ETag
+def fields_etag(etag, fields, format='json'):
+    if fields == PostSerializer.DEFAULT_FIELDS and format == 'json':
+        return etag
+    return make_etag(etag, fields, format)
+
+
+# Whole seconds, the resolution of Last-Modified
+def post_last_modified(post):
+    return int(max(post.updated_at, post.activity_at or post.updated_at).timestamp())
+
+
+# 304 (or 412) when the request's validators match, None otherwise
+def not_modified(request, etag=None, last_modified=None):
+    response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag is not None:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+# Conditional GET for list endpoints. The ETag is made of cache versions, so an
+# unchanged list is answered with a 304 without running the page or count
+# queries; filters and access are still checked first.
+class ConditionalListMixin:
+    # Columns read besides the serialized ones, for pagination and Last-Modified
+    reader_columns = ()
+
+    # Plain rows turned straight into output, when the serializer allows it
+    def get_reader(self):
+        return compiled_reader(self.get_serializer(), self.reader_columns)
+
+    # Version of every model shown in the list, username and counter changes included
+    def get_list_versions(self):
+        return get_list_versions(self.queryset.model, Post, CustomUser)
+
+    # Timestamp of a row in whole seconds, for the page's Last-Modified. Lists
+    # whose rows return None are validated by their ETag only.
+    def get_last_modified(self, obj):
+        return None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        user = request.user
+        etag = make_etag(
+            request.build_absolute_uri(), request.accepted_renderer.format,
+            user.pk, getattr(user, 'team_id', None), getattr(user, 'role', None),
+            self.get_list_versions(),
+        )
+        response = not_modified(request, etag=etag)
+        if response is not None:
+            return response
+
+        reader = self.get_reader()
+        if reader is not None:
+            queryset = reader.queryset(queryset)
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        data = reader.read_many(rows) if reader is not None else self.get_serializer(rows, many=True).data
+        response = self.get_paginated_response(data) if page is not None else Response(data)
+        timestamps = (self.get_last_modified(obj) for obj in page or ())
+        last_modified = max((timestamp for timestamp in timestamps if timestamp is not None), default=None)
+        return set_validators(response, etag, last_modified)
+
+
+# Lists restricted to one post only change with that post
+class PostScopedListMixin(ConditionalListMixin):
+    def get_list_versions(self):
+        post_id = self.request.query_params.get('post')
+        if post_id is not None:
+            return (post_version(int(post_id)),) + get_versions(CustomUser)
+        return super().get_list_versions()
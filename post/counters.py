@@ -0,0 +1,45 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, Now
+from .caching import bump_post_counters, bump_post_versions
+from .models import Comment, Like, Post
+
+
+# Atomic in-database increments, safe under concurrent likes and comments
+def adjust_post_counts(post_ids, likes=0, comments=0):
+    updates = {}
+    if likes:
+        updates['like_count'] = Greatest(F('like_count') + likes, 0)
+    if comments:
+        updates['comment_count'] = Greatest(F('comment_count') + comments, 0)
+    if not updates or not post_ids:
+        return
+    Post.objects.filter(id__in=post_ids).update(activity_at=Now(), **updates)
+    bump_post_counters()
+    bump_post_versions(post_ids)
+
+
+def _count_subquery(model):
+    return Coalesce(Subquery(
+        model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('*')).values('total')
+    ), 0)
+
+
+# Recompute the counters of posts with ids in [start, stop) that drifted, e.g.
+# after likes and comments were cascaded away with their user. Returns the
+# ids that were fixed.
+def reconcile_post_counts(start, stop, dry_run=False):
+    drifted = list(
+        Post.objects.filter(id__gte=start, id__lt=stop)
+        .annotate(actual_likes=_count_subquery(Like), actual_comments=_count_subquery(Comment))
+        .exclude(like_count=F('actual_likes'), comment_count=F('actual_comments'))
+        .values_list('id', flat=True)
+    )
+    if drifted and not dry_run:
+        # Counted again inside the UPDATE so concurrent writes are not lost
+        Post.objects.filter(id__in=drifted).update(
+            like_count=_count_subquery(Like),
+            comment_count=_count_subquery(Comment),
+        )
+        bump_post_counters()
+        bump_post_versions(drifted)
+    return drifted
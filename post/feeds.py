@@ -0,0 +1,128 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+
+from django.db.models import Q
+from django.utils import timezone
+from user.models import CustomUser
+from .audiences import AUTHENTICATED, PUBLIC, BATCH_SIZE, batches, audience_keys_for_post
+from .models import FeedEntry, Post
+
+# Posts open to these audiences are too widely read to be copied into every
+# feed, they are merged in when a feed is read (fan-out on read)
+BROAD_KEYS = {PUBLIC, AUTHENTICATED}
+
+# Team posts a user gets in their feed when they join a team. Older ones are
+# still readable, they are just not backfilled.
+FEED_BACKFILL_WINDOW = timedelta(days=30)
+
+POST_COLUMNS = (
+    'id', 'posted_on', 'author_id', 'author__team_id',
+    'public_permission', 'authenticated_permission', 'team_permission',
+)
+
+
+# Users whose feed holds the post: its author, plus their team when it is shared
+# with the team only. Broad posts are in no feed.
+def feed_recipients(author_id, author_team_id, public_permission, authenticated_permission, team_permission):
+    keys = audience_keys_for_post(
+        author_id, author_team_id, public_permission, authenticated_permission, team_permission,
+    )
+    if keys & BROAD_KEYS:
+        return []
+    if team_permission < 1:
+        return [author_id]
+    return CustomUser.objects.filter(team_id=author_team_id).values_list('id', flat=True).iterator(chunk_size=BATCH_SIZE)
+
+
+# Rewrite the feed entries of posts given as POST_COLUMNS rows (fan-out on write)
+def fan_out_posts(rows, created=False):
+    for batch in batches(rows):
+        if not created:
+            FeedEntry.objects.filter(post_id__in=[row[0] for row in batch]).delete()
+        entries = (
+            FeedEntry(user_id=user_id, post_id=row[0], posted_on=row[1])
+            for row in batch
+            for user_id in feed_recipients(*row[2:])
+        )
+        for chunk in batches(entries):
+            FeedEntry.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+def fan_out_post(post, created=False):
+    fan_out_posts([(
+        post.pk, post.posted_on, post.author_id, post.author.team_id,
+        post.public_permission, post.authenticated_permission, post.team_permission,
+    )], created=created)
+
+
+# The team posts of moved authors follow them to their new team, and the users
+# stop getting the posts of their former team and get those of their new one
+def sync_member_feeds(user_ids):
+    FeedEntry.objects.filter(user_id__in=user_ids).exclude(post__author_id__in=user_ids).delete()
+    posts = Post.objects.filter(author_id__in=user_ids, team_permission__gte=1).values_list(*POST_COLUMNS)
+    fan_out_posts(posts.order_by('id').iterator(chunk_size=BATCH_SIZE))
+    backfill_member_feeds(user_ids)
+
+
+# Copy the recent team-only posts of the users' current teams into their feeds
+def backfill_member_feeds(user_ids):
+    members = defaultdict(list)
+    for user_id, team_id in CustomUser.objects.filter(id__in=user_ids).values_list('id', 'team_id'):
+        members[team_id].append(user_id)
+    for team_id, team_members in members.items():
+        backfill_team_feeds(team_id, team_members)
+
+
+# Same for members of one team, e.g. a user who just registered into it
+def backfill_team_feeds(team_id, user_ids, now=None):
+    since = (now or timezone.now()) - FEED_BACKFILL_WINDOW
+    # Broad posts are merged in when the feed is read
+    posts = Post.objects.filter(
+        author__team_id=team_id, team_permission__gte=1, posted_on__gte=since,
+        public_permission=False, authenticated_permission=0,
+    ).values_list('id', 'posted_on').order_by('id')
+    entries = (
+        FeedEntry(user_id=user_id, post_id=post_id, posted_on=posted_on)
+        for post_id, posted_on in posts.iterator(chunk_size=BATCH_SIZE)
+        for user_id in user_ids
+    )
+    for chunk in batches(entries):
+        FeedEntry.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+# Recompute every feed, e.g. after bulk updates that bypassed signals
+def rebuild_feeds():
+    FeedEntry.objects.all().delete()
+    posts = Post.objects.values_list(*POST_COLUMNS).order_by('id')
+    fan_out_posts(posts.iterator(chunk_size=BATCH_SIZE), created=True)
+    return FeedEntry.objects.count()
+
+
+def _before(queryset, position, id_field):
+    if position is None:
+        return queryset
+    posted_on, pk = position
+    return queryset.filter(Q(posted_on__lt=posted_on) | Q(**{f'{id_field}__lt': pk}), posted_on__lte=posted_on)
+
+
+# The user's entries and the broad posts, each a bounded range scan on its own
+# index, so reading a feed costs the same whatever the number of posts
+def feed_sources(user, size, position=None):
+    return [
+        _before(FeedEntry.objects.filter(user=user), position, 'post_id')
+        .order_by('-posted_on', '-post_id').values_list('posted_on', 'post_id')[:size],
+        _before(Post.objects.filter(authenticated_permission__gte=1), position, 'id')
+        .order_by('-posted_on', '-id').values_list('posted_on', 'id')[:size],
+        _before(Post.objects.filter(public_permission=True), position, 'id')
+        .order_by('-posted_on', '-id').values_list('posted_on', 'id')[:size],
+    ]
+
+
+# (posted_on, post id) of the newest feed items strictly before `position`
+def feed_positions(user, size, position=None):
+    sources = feed_sources(user, size, position)
+    merged = heapq.merge(*(list(source) for source in sources), reverse=True)
+    # A post can come from several sources
+    return [key for key, _ in groupby(merged)][:size]
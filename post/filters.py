@@ -1,5 +1,6 @@
-from .models import Post, Like
-from django.db.models import Q
+from .models import Post, Like, Comment, PostAudience
+from .audiences import audience_keys_for_post, audience_keys_for_user
+from django.db.models import BooleanField, Exists, ExpressionWrapper, OuterRef, Q, Value
 from django_filters import rest_framework as filters
 from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
 from user.models import CustomUser as User
@@ -14,39 +15,123 @@ class PostAccessFilter:
         if hasattr(user, 'role') and user.role == 'admin':
             return Post.objects.all()
 
-        # Authenticated regular users
-        return Post.objects.filter(
-            Q(author=user) |
-            Q(author__team=user.team, team_permission__gte=1) |
-            Q(authenticated_permission__gte=1) |
-            Q(public_permission=True)
-        ).distinct()
+        # Authenticated regular users: own, same team, authenticated or public posts,
+        # resolved through the visibility index so no DISTINCT is needed
+        return Post.objects.filter(PostAccessFilter.accessible_condition(user))
+
+    # Flag every post of the queryset with whether the user can read it, in SQL
+    def annotate_accessible(queryset, user):
+        if not user.is_authenticated:
+            is_accessible = ExpressionWrapper(Q(public_permission=True), output_field=BooleanField())
+        elif hasattr(user, 'role') and user.role == 'admin':
+            is_accessible = Value(True)
+        else:
+            is_accessible = PostAccessFilter.accessible_condition(user)
+        return queryset.annotate(is_accessible=is_accessible)
+
+    # Same decision for a post already in memory, without a query
+    def is_accessible(post, user):
+        if user.is_authenticated and hasattr(user, 'role') and user.role == 'admin':
+            return True
+        keys = audience_keys_for_post(
+            post.author_id, post.author.team_id,
+            post.public_permission, post.authenticated_permission, post.team_permission,
+        )
+        return not keys.isdisjoint(audience_keys_for_user(user))
+
+    # Restrict likes or comments to those on posts the user can read
+    def filter_by_post_access(queryset, user):
+        if not user.is_authenticated:
+            return queryset.filter(post__public_permission=True)
+        if hasattr(user, 'role') and user.role == 'admin':
+            return queryset
+        return queryset.filter(PostAccessFilter.accessible_condition(user, post_ref='post_id'))
+
+    def accessible_condition(user, post_ref='pk'):
+        return Exists(PostAudience.objects.filter(
+            post=OuterRef(post_ref),
+            key__in=audience_keys_for_user(user),
+        ))
     
 
+# ?visibility= levels, each matching the posts open to that audience
+VISIBILITY_CONDITIONS = {
+    'public': Q(public_permission=True),
+    'authenticated': Q(authenticated_permission__gte=1),
+    'team': Q(team_permission__gte=1),
+    'private': Q(public_permission=False, authenticated_permission=0, team_permission=0),
+}
+
+
+# List filters, applied on top of the access filter. Each one is a condition on
+# the post row (or a many-to-one join for the team), so no DISTINCT is needed,
+# and each one is served by an index ordered like the list.
+class PostFilter(filters.FilterSet):
+    author = filters.NumberFilter(field_name='author')
+    team = filters.NumberFilter(field_name='author__team')
+    # ?posted_on_after=&posted_on_before=, ISO 8601, both inclusive
+    posted_on = filters.IsoDateTimeFromToRangeFilter()
+    visibility = filters.ChoiceFilter(
+        choices=[(level, level) for level in VISIBILITY_CONDITIONS], method='filter_visibility',
+    )
+
+    class Meta:
+        model = Post
+        fields = ['author', 'team', 'posted_on', 'visibility']
+
+    def filter_visibility(self, queryset, name, value):
+        return queryset.filter(VISIBILITY_CONDITIONS[value])
+
+
+# Date ranges of likes and comments, next to the post and user parameters
+class LikeFilter(filters.FilterSet):
+    liked_at = filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Like
+        fields = ['liked_at']
+
+
+class CommentFilter(filters.FilterSet):
+    commented_at = filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Comment
+        fields = ['commented_at']
+
+
 def get_queryset_aux(request, CLASS):
-    accesible_posts = PostAccessFilter.get_accessible_posts_for(user=request.user)
-    queryset = CLASS.objects.filter(post__in=accesible_posts).select_related('post', 'user')
+    viewer = request.user
+    queryset = CLASS.objects.select_related('post__author', 'user')
 
     post_id = request.query_params.get('post')
+    user_id = request.query_params.get('user')
+    check_user = user_id is not None and user_id.isdigit()
+
     if post_id is not None:
         if not post_id.isdigit():
             raise ParseError("Invalid post ID.")
-        if not Post.objects.filter(id=post_id).exists():
+        # A single query tells whether the post exists, whether it is readable
+        # and whether the user filter points to an existing user
+        posts = PostAccessFilter.annotate_accessible(Post.objects.filter(pk=post_id), viewer)
+        if check_user:
+            posts = posts.annotate(user_exists=Exists(User.objects.filter(pk=user_id)))
+        post = posts.values(*(['is_accessible', 'user_exists'] if check_user else ['is_accessible'])).first()
+        if post is None:
             raise NotFound("Post not found")
-        try:
-            post = accesible_posts.get(pk=post_id)
-        except (Post.DoesNotExist, ValueError):
+        if not post['is_accessible']:
             raise PermissionDenied("Post inaccessible.")
-        queryset = queryset.filter(post=post)
+        # The post is known to be readable, no access filter needed
+        queryset = queryset.filter(post_id=post_id)
+    else:
+        queryset = PostAccessFilter.filter_by_post_access(queryset, viewer)
 
-    user = request.query_params.get('user')
-    if user is not None:
-        if not user.isdigit():
+    if user_id is not None:
+        if not check_user:
             raise ParseError("Invalid User ID.")
-        try:
-            user = User.objects.get(pk=user)
-        except User.DoesNotExist:
+        user_exists = post['user_exists'] if post_id is not None else User.objects.filter(pk=user_id).exists()
+        if not user_exists:
             raise NotFound("User not found.")
-        queryset = queryset.filter(user=user)
+        queryset = queryset.filter(user_id=user_id)
 
-    return queryset
\ No newline at end of file
+    return queryset
@@ -0,0 +1,98 @@
+import secrets
+import time
+from contextlib import contextmanager
+from statistics import median
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import transaction
+from post.audiences import AUTHENTICATED, BATCH_SIZE, PUBLIC, user_key
+from post.caching import bump_post_versions, bump_public_posts, bump_versions
+from post.models import Comment, FeedEntry, Like, Post, PostAudience, TrendingScore
+from user.models import CustomUser
+
+SEED_BATCH_SIZE = 5000
+
+
+# Benchmarks write to the configured database, so they never run in production
+def check_benchmark_allowed():
+    if not settings.DEBUG:
+        raise CommandError("Benchmarks write test data and only run with DEBUG on.")
+
+
+# A throwaway user with a random password. On exit, the user is deleted along
+# with everything the benchmark wrote with it.
+@contextmanager
+def benchmark_user(role='blogger'):
+    check_benchmark_allowed()
+    name = f'bench-{secrets.token_hex(4)}'
+    password = secrets.token_urlsafe(16)
+    user = CustomUser.objects.create_user(email=f'{name}@email.com', username=name, password=password, role=role)
+    try:
+        yield user, password
+    finally:
+        delete_benchmark_data(user)
+
+
+# Seeded posts, likes and comments skipped signals when created, they are
+# deleted the same way along with the rows that refer to them. Caches built
+# from them are retired at the end.
+def delete_benchmark_data(user):
+    for model in (Like, Comment):
+        model.objects.filter(user=user)._raw_delete(model.objects.db)
+    posts = Post.objects.filter(author=user).order_by('id').values_list('id', flat=True)
+    while batch := list(posts[:BATCH_SIZE]):
+        with transaction.atomic():
+            Like.objects.filter(post_id__in=batch).delete()
+            Comment.objects.filter(post_id__in=batch).delete()
+            for model in (PostAudience, FeedEntry, TrendingScore):
+                model.objects.filter(post_id__in=batch).delete()
+            Post.objects.filter(pk__in=batch)._raw_delete(Post.objects.db)
+            bump_post_versions(batch)
+    bump_versions(Post, Like, Comment)
+    bump_public_posts(revoked=True)
+    user.delete()
+
+
+# Top up the posts table to `count` posts readable by any authenticated user.
+# bulk_create skips signals, so the visibility index is written alongside.
+def seed_posts(count, author, stdout=None):
+    missing = count - Post.objects.count()
+    created = 0
+    while created < missing:
+        size = min(SEED_BATCH_SIZE, missing - created)
+        with transaction.atomic():
+            posts = Post.objects.bulk_create([
+                Post(
+                    author=author,
+                    title=f"Benchmark post {created + i}",
+                    content="Lorem ipsum dolor sit amet. " * 20,
+                    excerpt="Lorem ipsum dolor sit amet. " * 7,
+                    authenticated_permission=1,
+                    team_permission=1,
+                    public_permission=(created + i) % 2 == 0,
+                )
+                for i in range(size)
+            ])
+            audiences = []
+            for post in posts:
+                audiences.append(PostAudience(post_id=post.pk, key=user_key(author.pk)))
+                audiences.append(PostAudience(post_id=post.pk, key=AUTHENTICATED))
+                if post.public_permission:
+                    audiences.append(PostAudience(post_id=post.pk, key=PUBLIC))
+            PostAudience.objects.bulk_create(audiences, ignore_conflicts=True)
+        created += size
+        if stdout is not None:
+            stdout.write(f"Seeded {created}/{missing} posts")
+    return Post.objects.count()
+
+
+# Median wall time of `fn` in milliseconds
+def timed(fn, repeat=5):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIRequestFactory, force_authenticate
+from post.models import Post
+from post.pagination import encode_post_cursor
+from post.viewsets import PostViewSet
+from ._benchmark import benchmark_user, seed_posts, timed
+
+
+class Command(BaseCommand):
+    help = "Compare /api/posts/ latency per page for page-number and cursor pagination."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000, help="Posts to seed before measuring.")
+        parser.add_argument('--page-size', type=int, default=10)
+        parser.add_argument('--pages', type=int, nargs='+', default=[1, 10, 100, 1000, 5000, 50000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with benchmark_user() as (user, _):
+            total = seed_posts(options['posts'], user, stdout=self.stdout)
+            page_size = options['page_size']
+
+            factory = APIRequestFactory()
+            view = PostViewSet.as_view({'get': 'list'})
+
+            def get(params):
+                request = factory.get('/api/posts/', params, HTTP_HOST='localhost')
+                force_authenticate(request, user=user)
+                response = view(request)
+                assert response.status_code == 200, response.data
+                return response
+
+            ordered = Post.objects.order_by('-posted_on', '-id').values_list('posted_on', 'id')
+
+            self.stdout.write(f"{total} posts, page_size={page_size}")
+            self.stdout.write(f"{'page':>8} {'offset ms':>12} {'cursor ms':>12}")
+            for page in options['pages']:
+                offset = (page - 1) * page_size
+                if offset >= total:
+                    break
+                cursor = ''
+                if offset:
+                    posted_on, pk = ordered[offset - 1]
+                    cursor = encode_post_cursor(posted_on, pk)
+
+                offset_ms = timed(lambda: get({'page': page, 'page_size': page_size}), options['repeat'])
+                cursor_ms = timed(lambda: get({'cursor': cursor, 'page_size': page_size}), options['repeat'])
+                self.stdout.write(f"{page:>8} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from post.models import Comment, Like, Post
+from post.readers import compiled_reader
+from post.renderers import FastJSONRenderer, MessagePackRenderer
+from post.serializers import CommentSerializer, LikeSerializer, PostSerializer
+from ._benchmark import benchmark_user, seed_posts, timed
+
+
+class Command(BaseCommand):
+    help = "Compare encoding time of post, like and comment pages with the JSON and MessagePack renderers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000, help="Posts to seed before measuring.")
+        parser.add_argument('--rows', type=int, default=500, help="Rows per page.")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_user() as (user, _):
+            seed_posts(options['posts'], user, stdout=self.stdout)
+            rows = options['rows']
+
+            posts = list(Post.objects.order_by('-posted_on', '-id')[:rows])
+            liked = set(Like.objects.filter(user=user, post__in=posts).values_list('post_id', flat=True))
+            Like.objects.bulk_create([Like(user=user, post=post) for post in posts if post.pk not in liked])
+            if Comment.objects.filter(user=user).count() < rows:
+                Comment.objects.bulk_create([Comment(user=user, post=post, content="Benchmark comment") for post in posts])
+
+            renderers = [('json', JSONRenderer()), ('orjson', FastJSONRenderer()), ('msgpack', MessagePackRenderer())]
+
+            cases = [
+                ('posts', Post.objects.select_related('author').order_by('-posted_on', '-id'), PostSerializer),
+                ('likes', Like.objects.order_by('-liked_at', '-id'), LikeSerializer),
+                ('comments', Comment.objects.select_related('user').order_by('-commented_at', '-id'), CommentSerializer),
+            ]
+
+            self.stdout.write(f"{rows} rows per page")
+            self.stdout.write(f"{'endpoint':>10} {'renderer':>10} {'ms/page':>10} {'rows/s':>10} {'bytes':>10}")
+            for name, queryset, serializer_class in cases:
+                reader = compiled_reader(serializer_class())
+                results = reader.read_many(reader.queryset(queryset[:rows]))
+                page = {'prev page': None, 'next page': None, 'current page': 1, 'pages': 1, 'count': len(results), 'results': results}
+
+                assert FastJSONRenderer().render(page) == JSONRenderer().render(page)
+                for renderer_name, renderer in renderers:
+                    ms = timed(lambda: renderer.render(page), options['repeat'])
+                    size = len(renderer.render(page))
+                    self.stdout.write(
+                        f"{name:>10} {renderer_name:>10} {ms:>10.3f} {len(results) * 1000 / ms:>10.0f} {size:>10}"
+                    )
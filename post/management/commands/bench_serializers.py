@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from post.models import Comment, Like, Post
+from post.readers import compiled_reader
+from post.serializers import CommentSerializer, LikeSerializer, PostSerializer
+from ._benchmark import benchmark_user, seed_posts, timed
+
+
+class Command(BaseCommand):
+    help = "Compare rows per second of the ModelSerializer and compiled read paths for list pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000, help="Posts to seed before measuring.")
+        parser.add_argument('--rows', type=int, default=100, help="Rows per page.")
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with benchmark_user() as (user, _):
+            seed_posts(options['posts'], user, stdout=self.stdout)
+            rows = options['rows']
+
+            # Every seeded post on the first page gets a like and a comment
+            page = list(Post.objects.order_by('-posted_on', '-id')[:rows])
+            liked = set(Like.objects.filter(user=user, post__in=page).values_list('post_id', flat=True))
+            Like.objects.bulk_create([Like(user=user, post=post) for post in page if post.pk not in liked])
+            if Comment.objects.filter(user=user).count() < rows:
+                Comment.objects.bulk_create([Comment(user=user, post=post, content="Benchmark comment") for post in page])
+
+            cases = [
+                ('posts', Post.objects.select_related('author').order_by('-posted_on', '-id'), PostSerializer),
+                ('likes', Like.objects.order_by('-liked_at', '-id'), LikeSerializer),
+                ('comments', Comment.objects.select_related('user').order_by('-commented_at', '-id'), CommentSerializer),
+            ]
+
+            self.stdout.write(f"{rows} rows per page")
+            self.stdout.write(f"{'endpoint':>10} {'serializer rows/s':>18} {'compiled rows/s':>16} {'speedup':>8}")
+            for name, queryset, serializer_class in cases:
+                reader = compiled_reader(serializer_class())
+                page = queryset[:rows]
+
+                def serialized():
+                    return serializer_class(list(page), many=True).data
+
+                def compiled():
+                    return reader.read_many(reader.queryset(page))
+
+                assert serialized() == compiled()
+                serializer_ms = timed(serialized, options['repeat'])
+                compiled_ms = timed(compiled, options['repeat'])
+                self.stdout.write(
+                    f"{name:>10} {rows * 1000 / serializer_ms:>18.0f} {rows * 1000 / compiled_ms:>16.0f}"
+                    f" {serializer_ms / compiled_ms:>7.1f}x"
+                )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from post.trending import TRENDING_HORIZON, compact_trending, rebuild_trending
+
+
+class Command(BaseCommand):
+    help = "Drop posts that stopped trending. Run it periodically, e.g. every hour."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help=f"Recompute every score from the likes and comments of the last {TRENDING_HORIZON.days} days instead.",
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            with transaction.atomic():
+                scores = rebuild_trending()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt trending scores of {scores} posts."))
+            return
+        dropped = compact_trending()
+        self.stdout.write(self.style.SUCCESS(f"Dropped {dropped} posts from trending."))
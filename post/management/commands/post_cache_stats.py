@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from post.caching import post_detail_stats, reset_post_detail_stats
+
+
+class Command(BaseCommand):
+    help = "Show hits and misses of the post detail cache since the last reset."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help="Reset the counters after showing them.")
+
+    def handle(self, *args, **options):
+        stats = post_detail_stats()
+        hit_rate = f"{stats['hit_rate']:.1%}" if stats['hit_rate'] is not None else "n/a"
+        self.stdout.write(f"Post detail cache: {stats['hits']} hits, {stats['misses']} misses, hit rate {hit_rate}")
+        if options['reset']:
+            reset_post_detail_stats()
+            self.stdout.write(self.style.SUCCESS("Counters reset."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from post.feeds import rebuild_feeds
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the home feeds from the posts. Run it after bulk updates "
+        "(QuerySet.update on posts or user teams) that bypass model signals."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            entries = rebuild_feeds()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt home feeds with {entries} entries."))
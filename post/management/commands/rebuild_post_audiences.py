@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from post.audiences import rebuild_post_audiences
+from post.caching import bump_public_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the post visibility index. Run it after bulk updates "
+        "(QuerySet.update on posts or user teams) that bypass model signals."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuilt = rebuild_post_audiences()
+            # Visibility may have changed behind the cached anonymous pages
+            bump_public_posts(revoked=True)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt visibility index for {rebuilt} posts."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from post.counters import reconcile_post_counts
+from post.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute drifted like_count and comment_count values, one id range at a time."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Posts checked per statement.")
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without fixing it.")
+
+    def handle(self, *args, **options):
+        bounds = Post.objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            self.stdout.write("No posts to reconcile.")
+            return
+
+        batch_size = options['batch_size']
+        drifted = 0
+        for start in range(bounds['first'], bounds['last'] + 1, batch_size):
+            fixed = reconcile_post_counts(start, start + batch_size, dry_run=options['dry_run'])
+            drifted += len(fixed)
+            if fixed:
+                self.stdout.write(f"Posts {start}-{start + batch_size - 1}: {len(fixed)} drifted")
+
+        verb = "Found" if options['dry_run'] else "Reconciled"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {drifted} drifted posts."))
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def team_key(team_id):
+    return f'team:{team_id}' if team_id is not None else 'team:none'
+
+
+def build_post_audiences(apps, schema_editor):
+    Post = apps.get_model('post', 'Post')
+    PostAudience = apps.get_model('post', 'PostAudience')
+    posts = Post.objects.values_list(
+        'id', 'author_id', 'author__team_id',
+        'public_permission', 'authenticated_permission', 'team_permission',
+    ).order_by('id')
+
+    audiences = []
+    for post_id, author_id, team_id, public, authenticated, team in posts.iterator(chunk_size=1000):
+        audiences.append(PostAudience(post_id=post_id, key=f'user:{author_id}'))
+        if public:
+            audiences.append(PostAudience(post_id=post_id, key='public'))
+        if authenticated >= 1:
+            audiences.append(PostAudience(post_id=post_id, key='authenticated'))
+        if team >= 1:
+            audiences.append(PostAudience(post_id=post_id, key=team_key(team_id)))
+        if len(audiences) >= 1000:
+            PostAudience.objects.bulk_create(audiences)
+            audiences = []
+    PostAudience.objects.bulk_create(audiences)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostAudience',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=40)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audiences', to='post.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'post'], name='post_audience_key_post_idx')],
+                'unique_together': {('post', 'key')},
+            },
+        ),
+        migrations.RunPython(build_post_audiences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:34
+
+from django.conf import settings
+from django.db import migrations, models
+from post.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently on PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0003_postaudience'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='post',
+            index=models.Index(fields=['-posted_on', '-id'], name='post_posted_on_id_idx'),
+        ),
+    ]
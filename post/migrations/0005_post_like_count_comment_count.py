@@ -0,0 +1,48 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:47
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# Posts are backfilled per range of ids, each range in its own transaction, so
+# that only the rows of the current range are locked
+BACKFILL_BATCH_SIZE = 5000
+
+
+def count_subquery(model):
+    return Coalesce(Subquery(
+        model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('*')).values('total')
+    ), 0)
+
+
+def backfill_counts(apps, schema_editor):
+    Post = apps.get_model('post', 'Post')
+    last = Post.objects.aggregate(last=Max('id'))['last'] or 0
+    for start in range(1, last + 1, BACKFILL_BATCH_SIZE):
+        Post.objects.filter(id__gte=start, id__lt=start + BACKFILL_BATCH_SIZE).update(
+            like_count=count_subquery(apps.get_model('post', 'Like')),
+            comment_count=count_subquery(apps.get_model('post', 'Comment')),
+        )
+
+
+class Migration(migrations.Migration):
+    # Backfill batches commit one by one, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0004_post_posted_on_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
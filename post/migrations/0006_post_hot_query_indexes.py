@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:13
+
+from django.db import migrations, models
+from post.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently on PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0005_post_like_count_comment_count'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='post',
+            index=models.Index(condition=models.Q(('public_permission', True)), fields=['-posted_on', '-id'], name='post_public_posted_on_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='post',
+            index=models.Index(condition=models.Q(('authenticated_permission__gte', 1)), fields=['-posted_on', '-id'], name='post_authenticated_posted_idx'),
+        ),
+    ]
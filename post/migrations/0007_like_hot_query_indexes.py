@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:13
+
+from django.db import migrations, models
+from post.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently on PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0006_post_hot_query_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='like',
+            index=models.Index(fields=['-liked_at', '-id'], name='like_liked_at_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='like',
+            index=models.Index(fields=['post', '-liked_at', '-id'], name='like_post_liked_at_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='like',
+            index=models.Index(fields=['user', '-liked_at', '-id'], name='like_user_liked_at_idx'),
+        ),
+    ]
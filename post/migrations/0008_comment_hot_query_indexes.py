@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:13
+
+from django.db import migrations, models
+from post.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently on PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0007_like_hot_query_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='comment',
+            index=models.Index(fields=['-commented_at', '-id'], name='comment_commented_at_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='comment',
+            index=models.Index(fields=['post', '-commented_at', '-id'], name='comment_post_commented_at_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='comment',
+            index=models.Index(fields=['user', '-commented_at', '-id'], name='comment_user_commented_at_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:01
+
+from django.db import migrations, models, transaction
+from django.db.models import F, Max, OuterRef, Q, Subquery
+
+# Posts are backfilled per range of ids, each range in its own transaction, so
+# that only the rows of the current range are locked
+BACKFILL_BATCH_SIZE = 5000
+
+
+def latest_subquery(model, field):
+    return Subquery(model.objects.filter(post=OuterRef('pk')).order_by(f'-{field}').values(field)[:1])
+
+
+# Existing posts were last updated when posted, and last active at their latest like or comment
+def backfill_timestamps(apps, schema_editor):
+    Post = apps.get_model('post', 'Post')
+    last = Post.objects.aggregate(last=Max('id'))['last'] or 0
+    for start in range(1, last + 1, BACKFILL_BATCH_SIZE):
+        posts = Post.objects.filter(id__gte=start, id__lt=start + BACKFILL_BATCH_SIZE)
+        with transaction.atomic():
+            posts.update(updated_at=F('posted_on'), activity_at=latest_subquery(apps.get_model('post', 'Like'), 'liked_at'))
+            (
+                posts.annotate(last_comment=latest_subquery(apps.get_model('post', 'Comment'), 'commented_at'))
+                .filter(Q(activity_at__isnull=True) | Q(activity_at__lt=F('last_comment')), last_comment__isnull=False)
+                .update(activity_at=F('last_comment'))
+            )
+
+
+class Migration(migrations.Migration):
+    # Backfill batches commit one by one, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0008_comment_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='activity_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(backfill_timestamps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Author, plus their team for posts shared with the team only
+def build_feeds(apps, schema_editor):
+    Post = apps.get_model('post', 'Post')
+    FeedEntry = apps.get_model('post', 'FeedEntry')
+    CustomUser = apps.get_model('user', 'CustomUser')
+    posts = Post.objects.filter(public_permission=False, authenticated_permission=0).values_list(
+        'id', 'posted_on', 'author_id', 'author__team_id', 'team_permission',
+    ).order_by('id')
+
+    members = {}
+    entries = []
+    for post_id, posted_on, author_id, team_id, team in posts.iterator(chunk_size=1000):
+        user_ids = [author_id]
+        if team >= 1:
+            if team_id not in members:
+                members[team_id] = list(CustomUser.objects.filter(team_id=team_id).values_list('id', flat=True))
+            user_ids = members[team_id]
+        entries.extend(FeedEntry(user_id=user_id, post_id=post_id, posted_on=posted_on) for user_id in user_ids)
+        if len(entries) >= 1000:
+            FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+            entries = []
+    FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0009_post_updated_at_activity_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posted_on', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to='post.post')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-posted_on', '-post'], name='feed_entry_user_posted_idx')],
+                'unique_together': {('user', 'post')},
+            },
+        ),
+        migrations.RunPython(build_feeds, migrations.RunPython.noop),
+    ]
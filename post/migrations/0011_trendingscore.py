@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('post', '0010_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='post.post')),
+                ('log_score', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-log_score'], name='trending_log_score_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:40
+
+from django.db import migrations
+
+# Full-text index over post titles and contents, maintained by the database
+# itself so that every write (bulk ones included) is searchable at once.
+# Neither is part of the model state, post.search reads them with raw SQL.
+
+# Rows are backfilled per range of ids, each range in its own transaction
+BACKFILL_BATCH_SIZE = 5000
+
+# A nullable column without default is added without rewriting the table. A
+# trigger fills it on writes, titles weighing more (A) than contents (B).
+POSTGRESQL_FORWARDS = [
+    "ALTER TABLE post_post ADD COLUMN IF NOT EXISTS search_document tsvector",
+    """
+    CREATE OR REPLACE FUNCTION post_search_document(title text, content text) RETURNS tsvector
+    LANGUAGE sql IMMUTABLE AS $$
+        SELECT setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+               setweight(to_tsvector('english'::regconfig, coalesce(content, '')), 'B')
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION post_search_document_trigger() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.search_document := post_search_document(NEW.title, NEW.content);
+        RETURN NEW;
+    END
+    $$
+    """,
+    "DROP TRIGGER IF EXISTS post_search_document ON post_post",
+    """
+    CREATE TRIGGER post_search_document BEFORE INSERT OR UPDATE OF title, content ON post_post
+    FOR EACH ROW EXECUTE FUNCTION post_search_document_trigger()
+    """,
+]
+POSTGRESQL_BACKFILL = (
+    "UPDATE post_post SET search_document = post_search_document(title, content) "
+    "WHERE id >= %s AND id < %s AND search_document IS NULL"
+)
+POSTGRESQL_INDEX = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS post_search_document_idx ON post_post USING GIN (search_document)"
+)
+POSTGRESQL_BACKWARDS = [
+    "DROP INDEX CONCURRENTLY IF EXISTS post_search_document_idx",
+    "DROP TRIGGER IF EXISTS post_search_document ON post_post",
+    "DROP FUNCTION IF EXISTS post_search_document_trigger()",
+    "DROP FUNCTION IF EXISTS post_search_document(text, text)",
+    "ALTER TABLE post_post DROP COLUMN IF EXISTS search_document",
+]
+
+# External content FTS5 table: it only holds the index, rows are read from
+# post_post by id. The excerpt is indexed for highlight() only.
+# Django rebuilds SQLite tables on some schema changes, which drops their
+# triggers: migrations altering post_post must be followed by these again.
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE post_search USING fts5(
+        title, content, excerpt, content='post_post', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER post_search_insert AFTER INSERT ON post_post BEGIN
+        INSERT INTO post_search (rowid, title, content, excerpt) VALUES (new.id, new.title, new.content, new.excerpt);
+    END
+    """,
+    """
+    CREATE TRIGGER post_search_delete AFTER DELETE ON post_post BEGIN
+        INSERT INTO post_search (post_search, rowid, title, content, excerpt)
+        VALUES ('delete', old.id, old.title, old.content, old.excerpt);
+    END
+    """,
+    """
+    CREATE TRIGGER post_search_update AFTER UPDATE OF title, content, excerpt ON post_post BEGIN
+        INSERT INTO post_search (post_search, rowid, title, content, excerpt)
+        VALUES ('delete', old.id, old.title, old.content, old.excerpt);
+        INSERT INTO post_search (rowid, title, content, excerpt) VALUES (new.id, new.title, new.content, new.excerpt);
+    END
+    """,
+    "INSERT INTO post_search (post_search) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS post_search_update",
+    "DROP TRIGGER IF EXISTS post_search_delete",
+    "DROP TRIGGER IF EXISTS post_search_insert",
+    "DROP TABLE IF EXISTS post_search",
+]
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_FORWARDS:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        for sql in POSTGRESQL_FORWARDS:
+            schema_editor.execute(sql)
+        # Rows written from here on are covered by the trigger
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT coalesce(max(id), 0) FROM post_post")
+            last = cursor.fetchone()[0]
+        for start in range(1, last + 1, BACKFILL_BATCH_SIZE):
+            schema_editor.execute(POSTGRESQL_BACKFILL, [start, start + BACKFILL_BATCH_SIZE])
+        schema_editor.execute(POSTGRESQL_INDEX)
+
+
+def backwards(apps, schema_editor):
+    statements = {'sqlite': SQLITE_BACKWARDS, 'postgresql': POSTGRESQL_BACKWARDS}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    # Backfill batches commit one by one and the index is built concurrently on
+    # PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0011_trendingscore'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
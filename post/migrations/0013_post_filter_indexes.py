@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 23:10
+
+from django.conf import settings
+from django.db import migrations, models
+from post.operations import AddIndexConcurrentlyOnPostgres
+
+
+class Migration(migrations.Migration):
+    # Indexes are built concurrently on PostgreSQL, outside a transaction
+    atomic = False
+
+    dependencies = [
+        ('post', '0012_post_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyOnPostgres(
+            model_name='post',
+            index=models.Index(fields=['author', '-posted_on', '-id'], name='post_author_posted_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='post',
+            index=models.Index(condition=models.Q(('team_permission__gte', 1)), fields=['-posted_on', '-id'], name='post_team_posted_idx'),
+        ),
+        AddIndexConcurrentlyOnPostgres(
+            model_name='post',
+            index=models.Index(condition=models.Q(('authenticated_permission', 0), ('public_permission', False), ('team_permission', 0)), fields=['-posted_on', '-id'], name='post_private_posted_idx'),
+        ),
+    ]
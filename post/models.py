@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import connections, models, router
+from django.db.models.signals import post_save
+from django.utils import timezone
 from user.models import CustomUser
 
 class Post(models.Model):
@@ -7,6 +9,9 @@ class Post(models.Model):
     content = models.TextField(blank=False)
     excerpt = models.TextField()
     posted_on = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Last like or comment added or removed, set with the counters
+    activity_at = models.DateTimeField(null=True, blank=True)
 
     permission_choices = (
         (0, 'None'),
@@ -17,17 +22,137 @@ class Post(models.Model):
     team_permission = models.PositiveSmallIntegerField(choices=permission_choices, default=0)
     public_permission = models.BooleanField(default=False)
 
+    # Denormalized totals, maintained atomically by the like and comment endpoints
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination walks (posted_on, id) in descending order
+            models.Index(fields=['-posted_on', '-id'], name='post_posted_on_id_idx'),
+            # Anonymous list: public posts, newest first
+            models.Index(
+                fields=['-posted_on', '-id'],
+                condition=models.Q(public_permission=True),
+                name='post_public_posted_on_idx',
+            ),
+            # Posts open to every authenticated user, newest first
+            models.Index(
+                fields=['-posted_on', '-id'],
+                condition=models.Q(authenticated_permission__gte=1),
+                name='post_authenticated_posted_idx',
+            ),
+            # Lists filtered by author (or by team, through its authors)
+            models.Index(fields=['author', '-posted_on', '-id'], name='post_author_posted_idx'),
+            # Lists filtered by visibility, for the levels not covered above
+            models.Index(
+                fields=['-posted_on', '-id'],
+                condition=models.Q(team_permission__gte=1),
+                name='post_team_posted_idx',
+            ),
+            models.Index(
+                fields=['-posted_on', '-id'],
+                condition=models.Q(public_permission=False, authenticated_permission=0, team_permission=0),
+                name='post_private_posted_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} by {self.author.email} on {self.posted_on.strftime('%Y-%m-%d %H:%M:%S')}"
     
 
+class LikeManager(models.Manager):
+    # Single INSERT ... ON CONFLICT DO NOTHING on the (post, user) constraint.
+    # Returns the new like, or None when the user already liked the post, even
+    # when both requests race.
+    def create_once(self, post, user):
+        like = self.model(post=post, user=user, liked_at=timezone.now())
+        db = router.db_for_write(self.model)
+        connection = connections[db]
+        qn = connection.ops.quote_name
+        liked_at = self.model._meta.get_field('liked_at').get_db_prep_value(like.liked_at, connection)
+
+        sql = (
+            f"INSERT INTO {qn(self.model._meta.db_table)} ({qn('post_id')}, {qn('user_id')}, {qn('liked_at')}) "
+            f"VALUES (%s, %s, %s) ON CONFLICT ({qn('post_id')}, {qn('user_id')}) DO NOTHING "
+            f"RETURNING {qn('id')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [post.pk, user.pk, liked_at])
+            row = cursor.fetchone()
+        if row is None:
+            return None
+
+        like.pk = row[0]
+        like._state.adding = False
+        like._state.db = db
+        post_save.send(sender=self.model, instance=like, created=True, update_fields=None, raw=False, using=db)
+        return like
+
+    # Bulk variants, like bulk_create they send no signals.
+    # Returns the ids of the posts that were actually liked.
+    def create_many_once(self, user, post_ids, liked_at=None):
+        if not post_ids:
+            return set()
+        db = router.db_for_write(self.model)
+        connection = connections[db]
+        qn = connection.ops.quote_name
+        liked_at = self.model._meta.get_field('liked_at').get_db_prep_value(liked_at or timezone.now(), connection)
+
+        values = ', '.join(['(%s, %s, %s)'] * len(post_ids))
+        params = [param for post_id in post_ids for param in (post_id, user.pk, liked_at)]
+        sql = (
+            f"INSERT INTO {qn(self.model._meta.db_table)} ({qn('post_id')}, {qn('user_id')}, {qn('liked_at')}) "
+            f"VALUES {values} ON CONFLICT ({qn('post_id')}, {qn('user_id')}) DO NOTHING "
+            f"RETURNING {qn('post_id')}"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return {row[0] for row in cursor.fetchall()}
+
+    # Returns when each post that was actually unliked had been liked, by post id
+    def delete_many(self, user, post_ids):
+        if not post_ids:
+            return {}
+        db = router.db_for_write(self.model)
+        connection = connections[db]
+        qn = connection.ops.quote_name
+
+        placeholders = ', '.join(['%s'] * len(post_ids))
+        sql = (
+            f"DELETE FROM {qn(self.model._meta.db_table)} "
+            f"WHERE {qn('user_id')} = %s AND {qn('post_id')} IN ({placeholders}) "
+            f"RETURNING {qn('post_id')}, {qn('liked_at')}"
+        )
+        # Raw rows hold the database's own datetime representation
+        field = self.model._meta.get_field('liked_at')
+        column = field.get_col(self.model._meta.db_table)
+        converters = connection.ops.get_db_converters(column) + field.get_db_converters(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.pk, *post_ids])
+            unliked = {}
+            for post_id, liked_at in cursor.fetchall():
+                for converter in converters:
+                    liked_at = converter(liked_at, column, connection)
+                unliked[post_id] = liked_at
+            return unliked
+
+
 class Like(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='likes')
     user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, blank=True, null=True, related_name='likes')
     liked_at = models.DateTimeField(auto_now_add=True)
 
+    objects = LikeManager()
+
     class Meta:
         unique_together = (('post', 'user'))
+        indexes = [
+            # Like lists are newest first, unfiltered or filtered by post or user
+            models.Index(fields=['-liked_at', '-id'], name='like_liked_at_idx'),
+            models.Index(fields=['post', '-liked_at', '-id'], name='like_post_liked_at_idx'),
+            models.Index(fields=['user', '-liked_at', '-id'], name='like_user_liked_at_idx'),
+        ]
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='comments')
@@ -35,5 +160,58 @@ class Comment(models.Model):
     content = models.TextField()
     commented_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Comment lists are newest first, unfiltered or filtered by post or user
+            models.Index(fields=['-commented_at', '-id'], name='comment_commented_at_idx'),
+            models.Index(fields=['post', '-commented_at', '-id'], name='comment_post_commented_at_idx'),
+            models.Index(fields=['user', '-commented_at', '-id'], name='comment_user_commented_at_idx'),
+        ]
+
 
+class PostAudience(models.Model):
+    # Materialized visibility index: one row per audience key allowed to read the post
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='audiences')
+    key = models.CharField(max_length=40)
 
+    class Meta:
+        unique_together = (('post', 'key'))
+        indexes = [
+            models.Index(fields=['key', 'post'], name='post_audience_key_post_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.key} can read post {self.post_id}"
+
+
+class FeedEntry(models.Model):
+    # Home feed written on post creation: posts shared with the user or their team
+    # only. Posts open to every authenticated user are merged in when reading.
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='feed_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='feed_entries')
+    # Copied from the post, feeds are read in this order
+    posted_on = models.DateTimeField()
+
+    class Meta:
+        unique_together = (('user', 'post'))
+        indexes = [
+            models.Index(fields=['user', '-posted_on', '-post'], name='feed_entry_user_posted_idx'),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} in the feed of user {self.user_id}"
+
+
+class TrendingScore(models.Model):
+    # Time-decayed likes and comments of a post, see post.trending
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True, related_name='trending')
+    log_score = models.FloatField()
+
+    class Meta:
+        indexes = [
+            # Trending posts are read from the top of this index
+            models.Index(fields=['-log_score'], name='trending_log_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"Post {self.post_id} trending at {self.log_score}"
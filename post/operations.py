@@ -0,0 +1,22 @@
+from django.db.migrations.operations import AddIndex
+
+
+# CREATE INDEX CONCURRENTLY on PostgreSQL so live tables keep taking writes,
+# a regular CREATE INDEX on other databases. Migrations using it must set
+# atomic = False, since PostgreSQL cannot build concurrently in a transaction.
+class AddIndexConcurrentlyOnPostgres(AddIndex):
+    def _concurrently(self, schema_editor):
+        return {'concurrently': True} if schema_editor.connection.vendor == 'postgresql' else {}
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, **self._concurrently(schema_editor))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, **self._concurrently(schema_editor))
+
+    def describe(self):
+        return super().describe().replace("Create index", "Create index (concurrently on PostgreSQL)", 1)
@@ -1,5 +1,16 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import b64decode, b64encode
+from datetime import datetime
+from math import ceil
+from urllib import parse
+
+from django.core.paginator import EmptyPage, InvalidPage, Page, PageNotAnInteger, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from .caching import cached_count, estimated_count
 
 def generate_paginated_response(response, data):
         return Response({
@@ -11,7 +22,101 @@ def generate_paginated_response(response, data):
         'results' : data
         })
 
-class PostCommentsPagination(PageNumberPagination):
+# Cursor pages have no page number or totals, only the links
+def generate_cursor_paginated_response(response, data):
+        return Response({
+        'prev page' : response.get_previous_link(),
+        'next page' : response.get_next_link(),
+        'results' : data
+        })
+
+# Default strategy: exact count, cached per query until one of its models is written
+class CachedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return cached_count(self.object_list)
+
+
+class UncountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+# ?count=false: no COUNT at all, one extra row tells whether a next page exists
+class UncountedPaginator(Paginator):
+    count = None
+    num_pages = None
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        return UncountedPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
+
+
+# ?count=estimate: planner estimate for large sets, exact cached count for small ones
+class EstimatedCountPaginator(UncountedPaginator):
+    exact_count_threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            return cached_count(self.object_list)
+        return estimate
+
+    @cached_property
+    def num_pages(self):
+        return max(1, ceil(self.count / self.per_page))
+
+
+class CountStrategyPagination(PageNumberPagination):
+    count_query_param = 'count'
+    count_paginator_classes = {
+        'exact': CachedCountPaginator,
+        'estimate': EstimatedCountPaginator,
+        'false': UncountedPaginator,
+    }
+
+    def get_django_paginator_class(self, request):
+        mode = request.query_params.get(self.count_query_param, 'exact').lower()
+        return self.count_paginator_classes.get(mode, CachedCountPaginator)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.get_django_paginator_class(request)(queryset, page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        if paginator.num_pages is not None and paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+
+class PostCommentsPagination(CountStrategyPagination):
     page_size = 10
     page_size_query_param = 'page_size'
 
@@ -19,9 +124,127 @@ class PostCommentsPagination(PageNumberPagination):
         return generate_paginated_response(self, data)
 
 
-class LikePagination(PageNumberPagination):
+class LikePagination(CountStrategyPagination):
     page_size = 20
     page_size_query_param = 'page_size'
 
     def get_paginated_response(self, data):
         return generate_paginated_response(self, data)
+
+
+def encode_post_cursor(posted_on, pk, reverse=False):
+    tokens = {'p': posted_on.isoformat(), 'i': pk}
+    if reverse:
+        tokens['r'] = 1
+    return b64encode(parse.urlencode(tokens).encode('ascii')).decode('ascii')
+
+
+def decode_post_cursor(encoded):
+    try:
+        querystring = b64decode(encoded.encode('ascii')).decode('ascii')
+        tokens = parse.parse_qs(querystring)
+        posted_on = datetime.fromisoformat(tokens['p'][0])
+        pk = int(tokens['i'][0])
+        reverse = bool(int(tokens.get('r', ['0'])[0]))
+    except (TypeError, ValueError, KeyError, UnicodeError):
+        raise NotFound("Invalid cursor.")
+    return (posted_on, pk), reverse
+
+
+# Keyset pagination over (posted_on, id): each page is a range scan from the
+# cursor, so deep pages cost the same as the first one and nothing is counted
+class PostKeysetPagination(BasePagination):
+    page_size = 10
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        position, reverse = decode_post_cursor(encoded) if encoded else (None, False)
+
+        if position is not None:
+            posted_on, pk = position
+            if reverse:
+                queryset = queryset.filter(Q(posted_on__gt=posted_on) | Q(id__gt=pk), posted_on__gte=posted_on)
+            else:
+                queryset = queryset.filter(Q(posted_on__lt=posted_on) | Q(id__lt=pk), posted_on__lte=posted_on)
+
+        ordering = ('posted_on', 'id') if reverse else ('-posted_on', '-id')
+        rows = list(queryset.order_by(*ordering)[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(request.query_params[self.page_size_query_param], strict=True)
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        return replace_query_param(self.base_url, self.cursor_query_param, encode_post_cursor(last.posted_on, last.id))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        first = self.page[0]
+        return replace_query_param(self.base_url, self.cursor_query_param, encode_post_cursor(first.posted_on, first.id, reverse=True))
+
+    def get_paginated_response(self, data):
+        return generate_cursor_paginated_response(self, data)
+
+
+# Page numbers by default, keyset pages when the client sends ?cursor= (empty for the first page)
+class PostPagination(PostCommentsPagination):
+    keyset_pagination_class = PostKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+# Forward-only cursor pages over a feed of (posted_on, post id) positions.
+# `feed(size, position)` returns the positions that follow the cursor.
+class FeedPagination(PostKeysetPagination):
+    max_page_size = 100
+
+    def paginate_feed(self, feed, request):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = min(self.get_page_size(request), self.max_page_size)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        position, reverse = decode_post_cursor(encoded) if encoded else (None, False)
+        if reverse:
+            raise NotFound("Invalid cursor.")
+
+        positions = feed(self.page_size + 1, position)
+        self.has_next, self.has_previous = len(positions) > self.page_size, False
+        self.page = positions[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, encode_post_cursor(*self.page[-1]))
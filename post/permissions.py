@@ -28,10 +28,11 @@ class PostPermissions(permissions.BasePermission):
         if not user or not user.is_authenticated:
             return False
         # Admins and authors can always read
-        if user.role == 'admin' or obj.author == user:
+        if user.role == 'admin' or obj.author_id == user.pk:
             return True
         # If user is not on the same team as the author, check authenticated_permission
-        if obj.author.team != user.team:
+        # (compared by id so the team rows are never loaded)
+        if obj.author.team_id != user.team_id:
             return obj.authenticated_permission >= READ_ONLY
         # Otherwise, check both authenticated and team permissions
         return (
@@ -46,10 +47,10 @@ class PostPermissions(permissions.BasePermission):
         if not user or not user.is_authenticated:
             return False
         # Admins and authors can always write
-        if user.role == 'admin' or obj.author == user:
+        if user.role == 'admin' or obj.author_id == user.pk:
             return True
         # If user is not on the same team as the author, check authenticated_permission
-        if obj.author.team != user.team:
+        if obj.author.team_id != user.team_id:
             return obj.authenticated_permission >= READ_AND_WRITE
         # Otherwise, check both authenticated and team permissions
         return (
@@ -71,7 +72,6 @@ class LikeAndCommentPermissions(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         user = request.user
         post_object = obj.post
-        user_object = obj.user
 
         permission = PostPermissions()
 
@@ -81,7 +81,7 @@ class LikeAndCommentPermissions(permissions.BasePermission):
 
         elif request.method == 'DELETE':
             # Only the owner or an admin can delete a like/comment
-            return user.is_authenticated and (user.role == 'admin' or user == user_object)
+            return user.is_authenticated and (user.role == 'admin' or user.pk == obj.user_id)
 
         # Deny all other unsafe methods by default
         return False
@@ -0,0 +1,92 @@
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# Fields whose output is the column value itself (the key column for relations)
+PLAIN_FIELDS = (
+    serializers.BooleanField, serializers.CharField, serializers.IntegerField, serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+# Fields that cannot be read from a single column
+UNSUPPORTED_FIELDS = (
+    serializers.BaseSerializer, serializers.HiddenField, serializers.ManyRelatedField, serializers.SerializerMethodField,
+)
+
+_readers = {}
+
+
+# Formatters are bound once per batch of rows, so that per-request settings such
+# as the current time zone are looked up once instead of once per value.
+# A bound formatter of None means the value is output as is.
+def _bind_formatter(field):
+    if isinstance(field, PLAIN_FIELDS):
+        return None
+    if type(field) is serializers.ChoiceField:
+        lookup = field.choice_strings_to_values.get
+        return lambda value: lookup(str(value), value)
+    if isinstance(field, serializers.DateTimeField):
+        return _bind_datetime_formatter(field)
+    return field.to_representation
+
+
+# Same output as DateTimeField.to_representation for ISO 8601
+def _bind_datetime_formatter(field):
+    if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601:
+        return field.to_representation
+    tz = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if tz is None:
+        return field.to_representation
+
+    def format_datetime(value):
+        if timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return format_datetime
+
+
+# Read-only path for list pages: rows come from values_list() and are turned
+# into the serializer's output directly, with no model or serializer per row
+class CompiledReader:
+    def __init__(self, fields, extra_columns=()):
+        self.fields = [(name, field) for name, field in fields.items() if not field.write_only]
+        columns = [field.source.replace('.', '__') for _, field in self.fields]
+        # Extra columns come last, rows are read by position
+        self.columns = list(dict.fromkeys(columns + list(extra_columns)))
+        self.positions = [self.columns.index(column) for column in columns]
+
+    # Rows are named tuples, so pagination and Last-Modified can still read attributes
+    def queryset(self, queryset):
+        return queryset.values_list(*self.columns, named=True)
+
+    def read(self, rows):
+        layout = [
+            (name, position, _bind_formatter(field)) for (name, field), position in zip(self.fields, self.positions)
+        ]
+        for row in rows:
+            data = {}
+            for name, position, formatter in layout:
+                value = row[position]
+                data[name] = value if formatter is None or value is None else formatter(value)
+            yield data
+
+    def read_many(self, rows):
+        return list(self.read(rows))
+
+
+def _supported(field):
+    if isinstance(field, UNSUPPORTED_FIELDS) or field.source == '*':
+        return False
+    if isinstance(field, serializers.RelatedField):
+        return isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None
+    return True
+
+
+# Reader for a serializer instance, None when one of its fields needs the model
+def compiled_reader(serializer, extra_columns=()):
+    fields = serializer.fields
+    key = (type(serializer), tuple(fields), tuple(extra_columns))
+    if key not in _readers:
+        readable = [field for field in fields.values() if not field.write_only]
+        _readers[key] = CompiledReader(fields, extra_columns) if all(map(_supported, readable)) else None
+    return _readers[key]
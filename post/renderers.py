@@ -0,0 +1,108 @@
+import json
+import zlib
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+# Lines are sent in blocks of about this size
+STREAM_BUFFER_SIZE = 64 * 1024
+
+# Types orjson would encode differently from DRF's encoder go through its default()
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+_default = encoders.JSONEncoder().default
+
+
+# Whether an Accept-Encoding header allows gzip: listed (or covered by *) with a
+# non-zero q-value. Codings with a malformed q-value are not acceptable.
+def accepts_gzip(header):
+    qualities = {}
+    for coding in header.split(','):
+        name, *params = [part.strip() for part in coding.split(';')]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    quality = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+    return quality > 0
+
+
+# Compact UTF-8 JSON, as JSONRenderer outputs with the default settings.
+# Values orjson refuses (integers over 64 bits, non-string keys) use the json module.
+def dumps(data, option=0):
+    try:
+        ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS | option)
+    except orjson.JSONEncodeError:
+        ret = json.dumps(
+            data, cls=encoders.JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':'),
+        ).encode()
+        if option & orjson.OPT_APPEND_NEWLINE:
+            ret += b'\n'
+    # Same escapes as JSONRenderer, keeping the output a strict javascript subset
+    if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+        ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+    return ret
+
+
+# JSONRenderer with orjson. Indented output (Accept: application/json; indent=4,
+# browsable API) and non-default JSON settings are left to JSONRenderer.
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+# Binary responses for internal services (Accept: application/msgpack). Values
+# are the ones the JSON renderers output, dates and decimals included.
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_default, use_bin_type=True, datetime=False)
+
+
+def ndjson_line(data):
+    return dumps(data, orjson.OPT_APPEND_NEWLINE)
+
+
+# Newline-delimited JSON, one object per line. Used as is for errors, exports
+# stream their rows through ndjson_stream.
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b'' if data is None else ndjson_line(data)
+
+
+# Encode rows lazily, optionally gzipped, holding at most one block in memory
+def ndjson_stream(rows, gzipped=False):
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if gzipped else None
+    block = bytearray()
+    for row in rows:
+        block += ndjson_line(row)
+        if len(block) >= STREAM_BUFFER_SIZE:
+            chunk = compressor.compress(bytes(block)) if compressor else bytes(block)
+            block.clear()
+            if chunk:
+                yield chunk
+    chunk = bytes(block)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,64 @@
+import re
+from html import escape
+
+from django.db import connections
+
+# Terms beyond this are ignored, each one narrows the match further
+MAX_SEARCH_TERMS = 16
+SEARCH_CONFIG = 'english'
+
+# Matches are marked with private use characters in SQL, so that the excerpt can
+# be HTML-escaped before the marks become <mark> tags
+MARK_START, MARK_END = '\ue000', '\ue001'
+
+find_terms = re.compile(r'\w+').findall
+
+
+# Words of a user query, all of which a post must contain
+def search_terms(query):
+    return find_terms(query)[:MAX_SEARCH_TERMS]
+
+
+# Matching posts of the queryset, annotated with their `search_rank` (higher is
+# better) and `snippet`, their excerpt with the matches marked. The match runs
+# on the full-text index of title and content:
+# - PostgreSQL: the post_post.search_document tsvector, set by a trigger, with a GIN index
+# - SQLite: the post_search FTS5 table, kept in sync with post_post by triggers
+# Both are created by migration 0012, see there.
+def search_posts(queryset, terms):
+    connection = connections[queryset.db]
+    post = connection.ops.quote_name(queryset.model._meta.db_table)
+    if connection.vendor == 'postgresql':
+        tsquery = "plainto_tsquery(%s::regconfig, %s)"
+        text = ' '.join(terms)
+        document = f"{post}.search_document"
+        options = f'StartSel={MARK_START}, StopSel={MARK_END}, HighlightAll=true'
+        return queryset.extra(
+            where=[f"{document} @@ {tsquery}"],
+            params=[SEARCH_CONFIG, text],
+            select={
+                # Title matches (weight A) count more than content ones (weight B)
+                'search_rank': f"ts_rank_cd({document}, {tsquery})",
+                'snippet': f"ts_headline(%s::regconfig, {post}.excerpt, {tsquery}, %s)",
+            },
+            select_params=[SEARCH_CONFIG, text, SEARCH_CONFIG, SEARCH_CONFIG, text, options],
+        )
+
+    # Terms are quoted, so that user input is never read as FTS5 query syntax
+    match = ' '.join('"%s"' % term for term in terms)
+    return queryset.extra(
+        tables=['post_search'],
+        where=[f"post_search.rowid = {post}.id", "post_search MATCH %s"],
+        params=[match],
+        select={
+            # bm25() is lower for better matches. The excerpt is indexed only for
+            # highlight(), with no weight, as it repeats the start of the content.
+            'search_rank': "-bm25(post_search, 10.0, 1.0, 0.0)",
+            'snippet': "highlight(post_search, 2, %s, %s)",
+        },
+        select_params=[MARK_START, MARK_END],
+    )
+
+
+def render_snippet(snippet):
+    return escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
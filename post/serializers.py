@@ -1,13 +1,26 @@
 from rest_framework import serializers
 from .models import Post, Like, Comment
+from rest_framework.settings import api_settings
 from rest_framework.validators import ValidationError
 
 class PostSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='author.username', read_only=True)
 
+    # Returned unless the caller picks other fields; the excerpt is only on request
+    DEFAULT_FIELDS = ['id', 'title', 'content', 'username', 'posted_on', 'updated_at', 'authenticated_permission','team_permission','public_permission', 'like_count', 'comment_count']
+    EXCERPT_FIELDS = [('excerpt' if name == 'content' else name) for name in DEFAULT_FIELDS]
+
     class Meta:
         model = Post
-        fields = ['id', 'title', 'content', 'username', 'posted_on', 'authenticated_permission','team_permission','public_permission']
+        fields = ['id', 'title', 'content', 'excerpt', 'username', 'posted_on', 'updated_at', 'authenticated_permission','team_permission','public_permission', 'like_count', 'comment_count']
+        read_only_fields = ['excerpt', 'updated_at', 'like_count', 'comment_count']
+
+    # Sparse fieldsets: only the given field names are kept
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        kept = set(fields or self.DEFAULT_FIELDS)
+        for name in [name for name in self.fields if name not in kept]:
+            self.fields.pop(name)
 
 
     def validate(self, attrs):
@@ -29,20 +42,38 @@ class LikeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Like
         fields = '__all__'
+        # The author is needed right away for the read access check
+        extra_kwargs = {'post': {'queryset': Post.objects.select_related('author')}}
 
-    def validate(self, attrs):
-        user = self.context['request'].user
-        post = attrs['post']
-        
-        # Avoid duplicated like from same user
-        if Like.objects.filter(post=post, user=user).exists():
-            raise ValidationError("You already liked the post.")
-
-        return attrs
+    def create(self, validated_data):
+        # Avoid duplicated like from same user, decided by the insert itself
+        like = Like.objects.create_once(post=validated_data['post'], user=validated_data['user'])
+        if like is None:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: ["You already liked the post."]})
+        return like
 
 class CommentSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
 
     class Meta:
         model = Comment
-        fields = ['id', 'post', 'username', 'content'] 
\ No newline at end of file
+        fields = ['id', 'post', 'username', 'content']
+        extra_kwargs = {'post': {'queryset': Post.objects.select_related('author')}}
+
+
+class LikeToggleSerializer(serializers.Serializer):
+    MAX_POSTS = 1000
+
+    like = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=MAX_POSTS)
+    unlike = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list, max_length=MAX_POSTS)
+
+    def validate(self, attrs):
+        # Keep the first occurrence of every id, in request order
+        attrs['like'] = list(dict.fromkeys(attrs['like']))
+        attrs['unlike'] = list(dict.fromkeys(attrs['unlike']))
+
+        if set(attrs['like']) & set(attrs['unlike']):
+            raise ValidationError("A post cannot be liked and unliked in the same request.")
+        if not attrs['like'] and not attrs['unlike']:
+            raise ValidationError("Provide posts to like or unlike.")
+        return attrs
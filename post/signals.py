@@ -0,0 +1,126 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from user.models import CustomUser, Team
+from .models import Comment, Like, Post
+from .audiences import PUBLIC, sync_author_audiences, sync_post_audiences
+from .caching import bump_post_versions, bump_public_posts, bump_versions
+from .feeds import backfill_team_feeds, fan_out_post, sync_member_feeds
+from .trending import COMMENT_WEIGHT, LIKE_WEIGHT, add_activity, remove_activity
+
+
+# Keep the visibility index in step with the post's permissions and author
+@receiver(post_save, sender=Post)
+def sync_audiences_on_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    current, wanted = sync_post_audiences(instance, created=created)
+    # The anonymous list shows public posts only
+    if PUBLIC in current or PUBLIC in wanted:
+        bump_public_posts(revoked=PUBLIC not in wanted)
+    # Feeds only change with the audience
+    if created or current != wanted:
+        fan_out_post(instance, created=created)
+
+
+# Team audiences follow the author when they move to another team, and new
+# users get the recent posts of the team they join
+@receiver(post_save, sender=CustomUser)
+def sync_audiences_on_team_change(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        backfill_team_feeds(instance.team_id, [instance.pk])
+        return
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is not None and loaded.get('team_id') == instance.team_id:
+        return
+    sync_author_audiences([instance.pk])
+    sync_member_feeds([instance.pk])
+    bump_versions(Post)
+
+
+# Deleting a team nulls its members' team in bulk, which bypasses save()
+@receiver(pre_delete, sender=Team)
+def remember_team_members(sender, instance, **kwargs):
+    instance._member_ids = list(instance.users.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Team)
+def sync_audiences_on_team_delete(sender, instance, **kwargs):
+    member_ids = getattr(instance, '_member_ids', [])
+    if member_ids:
+        sync_author_audiences(member_ids)
+        sync_member_feeds(member_ids)
+        bump_versions(Post)
+
+
+# Retire cached counts built from the written model
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_cache_versions(sender, **kwargs):
+    bump_versions(sender)
+
+
+# Likes and comments written directly also change their post's lists
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_post_version_on_activity(sender, instance, **kwargs):
+    bump_post_versions([instance.post_id])
+
+
+# Usernames are shown in post and comment lists
+@receiver(post_save, sender=CustomUser)
+def bump_users_on_username_change(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is not None and loaded.get('username') == instance.username:
+        return
+    bump_versions(CustomUser)
+
+
+# Retire the cached detail of an updated or deleted post
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_detail_version(sender, instance, **kwargs):
+    bump_post_versions([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def bump_public_posts_on_delete(sender, instance, **kwargs):
+    if instance.public_permission:
+        bump_public_posts(revoked=True)
+
+
+# Trending scores follow likes and comments as they come and go
+@receiver(post_save, sender=Like)
+def add_like_to_trending(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_activity([(instance.post_id, instance.liked_at)], LIKE_WEIGHT)
+
+
+# Nothing to remove when the post itself is deleted, its score goes with it
+@receiver(post_delete, sender=Like)
+def remove_like_from_trending(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Post):
+        return
+    remove_activity([(instance.post_id, instance.liked_at)], LIKE_WEIGHT)
+
+
+@receiver(post_save, sender=Comment)
+def add_comment_to_trending(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        add_activity([(instance.post_id, instance.commented_at)], COMMENT_WEIGHT)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_trending(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, Post):
+        return
+    remove_activity([(instance.post_id, instance.commented_at)], COMMENT_WEIGHT)
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Like, Comment
+from post import conditional, viewsets
+from post.readers import compiled_reader
+from post.serializers import PostSerializer, LikeSerializer, CommentSerializer
+from rest_framework import status
+
+
+def read_rows(client, url):
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    if response.streaming:
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    return json.loads(response.content)['results']
+
+
+@pytest.mark.django_db
+class TestCompiledReaders:
+    @pytest.mark.parametrize("endpoint, model, serializer_class", [
+        ('posts', Post, PostSerializer),
+        ('likes', Like, LikeSerializer),
+        ('comments', Comment, CommentSerializer),
+    ])
+    def test_list_matches_serializer(self, defaultTeamClient, activity, endpoint, model, serializer_class):
+        response = defaultTeamClient.get(f"/api/{endpoint}/")
+        assert response.status_code == status.HTTP_200_OK
+        results = response.data['results']
+        assert results
+
+        objects = model.objects.in_bulk([row['id'] for row in results])
+        expected = [serializer_class(objects[row['id']]).data for row in results]
+        assert results == expected
+        assert [list(row) for row in results] == [list(row) for row in expected]
+
+    def test_sparse_and_cursor_pages(self, defaultTeamClient, activity):
+        response = defaultTeamClient.get("/api/posts/?mode=excerpt&page_size=2&cursor=")
+        assert response.status_code == status.HTTP_200_OK
+        first = response.data['results']
+        post = Post.objects.get(id=first[0]['id'])
+        assert first[0] == PostSerializer(post, fields=PostSerializer.EXCERPT_FIELDS).data
+
+        response = defaultTeamClient.get(response.data['next page'])
+        assert [row['id'] for row in response.data['results']] == [first[1]['id'] - 1, first[1]['id'] - 2]
+
+    def test_lists_skip_model_instances(self, defaultTeamClient, activity, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("model instance built")
+
+        for model in (Post, Like, Comment):
+            monkeypatch.setattr(model, 'from_db', classmethod(fail))
+        for endpoint in ('posts', 'likes', 'comments'):
+            assert defaultTeamClient.get(f"/api/{endpoint}/").status_code == status.HTTP_200_OK
+
+    # Serializers without a reader fall back to regular serialization everywhere
+    @pytest.mark.parametrize("url", [
+        "/api/posts/", "/api/posts/export/", "/api/posts/trending/", "/api/posts/search/?q=title", "/api/feed/",
+    ])
+    def test_serializer_fallback(self, defaultTeamClient, activity, monkeypatch, url):
+        expected = read_rows(defaultTeamClient, url)
+        assert expected
+
+        for module in (conditional, viewsets):
+            monkeypatch.setattr(module, 'compiled_reader', lambda *args, **kwargs: None)
+        assert read_rows(defaultTeamClient, url) == expected
+
+    def test_unsupported_serializer_has_no_reader(self):
+        class TitleSerializer(serializers.ModelSerializer):
+            shout = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Post
+                fields = ['id', 'shout']
+
+            def get_shout(self, post):
+                return post.title.upper()
+
+        assert compiled_reader(TitleSerializer()) is None
+        assert compiled_reader(PostSerializer()) is not None
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+# Posts with and without activity, liked and commented by users of another team
+@pytest.fixture
+def activity(defaultTeamUser):
+    team, _ = Team.objects.get_or_create(name="Team A")
+    other = User.objects.create_user(email="tau@email.com", username="tau", password="tau", team=team)
+    for i in range(5):
+        post = Post.objects.create(
+            author=other if i % 2 else defaultTeamUser, title=f"Title {i}", content="Content", excerpt="Excerpt",
+            authenticated_permission=1, public_permission=i == 0,
+        )
+        if i % 2:
+            Like.objects.create(user=defaultTeamUser, post=post)
+            Comment.objects.create(user=other, post=post, content=f"Comment {i}")
+    Like.objects.create(user=None, post=post)
@@ -0,0 +1,177 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.conditional import ConditionalListMixin
+from post.models import Post, Like, Comment
+from post.viewsets import LikeViewSet
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    def test_post_detail_not_modified(self, defaultTeamClient, teamAUser, django_assert_num_queries):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        response = defaultTeamClient.get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_200_OK
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        with django_assert_num_queries(0):
+            response = defaultTeamClient.get(f"/api/posts/{post.id}/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+        assert not response.content
+
+        response = defaultTeamClient.get(f"/api/posts/{post.id}/", HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_post_detail_not_modified_without_cache(self, defaultTeamClient, teamAUser, django_assert_num_queries):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        etag = defaultTeamClient.get(f"/api/posts/{post.id}/")['ETag']
+        cache.clear()
+
+        with django_assert_num_queries(1):
+            response = defaultTeamClient.get(f"/api/posts/{post.id}/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_post_detail_changes(self, defaultTeamClient, teamAClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        etag = defaultTeamClient.get(f"/api/posts/{post.id}/")['ETag']
+
+        teamAClient.patch(f"/api/posts/{post.id}/", data={"content": "Edited", "authenticated_permission": 1})
+        response = defaultTeamClient.get(f"/api/posts/{post.id}/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['content'] == "Edited"
+        etag = response['ETag']
+
+        defaultTeamClient.post("/api/likes/", data={"post": post.id})
+        response = defaultTeamClient.get(f"/api/posts/{post.id}/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['like_count'] == 1
+        post.refresh_from_db()
+        assert post.activity_at is not None
+
+    def test_access_checked_before_not_modified(self, defaultTeamClient, teamAClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", team_permission=1)
+        etag = teamAClient.get(f"/api/posts/{post.id}/")['ETag']
+
+        response = defaultTeamClient.get(f"/api/posts/{post.id}/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_post_list_not_modified(self, defaultTeamClient, teamAUser, django_assert_num_queries):
+        Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        response = defaultTeamClient.get("/api/posts/")
+        assert 'Last-Modified' in response
+
+        with django_assert_num_queries(0):
+            response = defaultTeamClient.get("/api/posts/", HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        etag = response['ETag']
+        Post.objects.create(author=teamAUser, title="New", content="Content", authenticated_permission=1)
+        response = defaultTeamClient.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+
+    def test_list_etag_depends_on_viewer_and_page(self, defaultTeamClient, teamAClient, teamAUser):
+        Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        etag = defaultTeamClient.get("/api/posts/")['ETag']
+
+        assert teamAClient.get("/api/posts/", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+        assert defaultTeamClient.get("/api/posts/?page_size=5", HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+    def test_list_without_last_modified(self, defaultTeamClient, defaultTeamUser, teamAUser, monkeypatch):
+        monkeypatch.setattr(LikeViewSet, 'get_last_modified', ConditionalListMixin.get_last_modified)
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        Like.objects.create(user=defaultTeamUser, post=post)
+
+        response = defaultTeamClient.get("/api/likes/")
+        assert response.status_code == status.HTTP_200_OK
+        assert 'Last-Modified' not in response
+        response = defaultTeamClient.get("/api/likes/", HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_anonymous_list_not_modified(self, teamAUser):
+        Post.objects.create(author=teamAUser, title="Title", content="Content", public_permission=True)
+        client = APIClient()
+        etag = client.get("/api/posts/")['ETag']
+
+        response = client.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['X-Cache'] == "HIT"
+
+    def test_comments_of_post_not_modified(self, defaultTeamClient, defaultTeamUser, teamAUser, django_assert_num_queries):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        other = Post.objects.create(author=teamAUser, title="Other", content="Content", authenticated_permission=1)
+        defaultTeamClient.post("/api/comments/", data={"post": post.id, "content": "Comment"})
+        response = defaultTeamClient.get(f"/api/comments/?post={post.id}")
+        etag = response['ETag']
+        assert 'Last-Modified' in response
+
+        # Only the filter validation runs
+        with django_assert_num_queries(1):
+            response = defaultTeamClient.get(f"/api/comments/?post={post.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        # Activity on another post leaves this list alone
+        defaultTeamClient.post("/api/comments/", data={"post": other.id, "content": "Comment"})
+        response = defaultTeamClient.get(f"/api/comments/?post={post.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        Comment.objects.create(user=defaultTeamUser, post=post, content="Direct")
+        response = defaultTeamClient.get(f"/api/comments/?post={post.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+
+    def test_username_change_invalidates_lists(self, defaultTeamClient, defaultTeamUser, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        Like.objects.create(user=defaultTeamUser, post=post)
+        Comment.objects.create(user=defaultTeamUser, post=post, content="Comment")
+        etag = defaultTeamClient.get(f"/api/comments/?post={post.id}")['ETag']
+
+        defaultTeamUser.username = "renamed"
+        defaultTeamUser.save()
+        response = defaultTeamClient.get(f"/api/comments/?post={post.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'][0]['username'] == "renamed"
+
+    def test_invalid_filter_is_reported_before_not_modified(self, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        url = f"/api/likes/?post={post.id}"
+        etag = defaultTeamClient.get(url)['ETag']
+        post.delete()
+
+        response = defaultTeamClient.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.audiences import rebuild_post_audiences
+from post.feeds import FEED_BACKFILL_WINDOW, rebuild_feeds
+from post.models import FeedEntry, Post
+from rest_framework import status
+
+
+def feed_titles(client, url="/api/feed/"):
+    titles = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        titles += [post['title'] for post in response.data['results']]
+        url = response.data['next page']
+    return titles
+
+
+@pytest.mark.django_db
+class TestFeed:
+    def test_feed_follows_read_access(self, teamAClient, teamAUser, teamAMate, teamBUser):
+        Post.objects.create(author=teamAUser, title="Own")
+        Post.objects.create(author=teamAMate, title="Team", team_permission=1)
+        Post.objects.create(author=teamAMate, title="Private")
+        Post.objects.create(author=teamBUser, title="Other team", team_permission=1)
+        Post.objects.create(author=teamBUser, title="Authenticated", authenticated_permission=1)
+        Post.objects.create(author=teamBUser, title="Public", public_permission=True)
+
+        assert feed_titles(teamAClient) == ["Public", "Authenticated", "Team", "Own"]
+        # Only posts shared with a few users are written to feeds
+        assert sorted(FeedEntry.objects.values_list('post__title', flat=True)) == [
+            "Other team", "Own", "Private", "Team", "Team",
+        ]
+
+    def test_merged_pages_in_order(self, teamAClient, teamAUser, teamAMate, teamBUser):
+        now = timezone.now()
+        authors = [teamAMate, teamBUser, teamBUser, teamBUser]
+        for i in range(25):
+            post = Post.objects.create(
+                author=authors[i % 4], title=f"Post {i}", team_permission=1,
+                authenticated_permission=1 if i % 4 == 1 else 0, public_permission=i % 4 == 2,
+            )
+            # Several posts share a timestamp, ties are broken by id
+            Post.objects.filter(pk=post.pk).update(posted_on=now - timedelta(minutes=i // 3))
+        rebuild_feeds()
+
+        # Team B's team posts are left out
+        expected = [f"Post {i}" for i in sorted(range(25), key=lambda i: (i // 3, -i)) if i % 4 != 3]
+        assert feed_titles(teamAClient, "/api/feed/?page_size=4") == expected
+
+    def test_visibility_changes(self, teamAClient, teamAMate):
+        post = Post.objects.create(author=teamAMate, title="Draft")
+        assert feed_titles(teamAClient) == []
+
+        post.team_permission = 1
+        post.save()
+        assert feed_titles(teamAClient) == ["Draft"]
+
+        post.team_permission = 0
+        post.save()
+        assert feed_titles(teamAClient) == []
+        assert list(FeedEntry.objects.values_list('user_id', flat=True)) == [teamAMate.id]
+
+    def test_team_change(self, teamAClient, teamAUser, teamAMate, teamBUser):
+        Post.objects.create(author=teamAMate, title="Team A", team_permission=1)
+        Post.objects.create(author=teamAUser, title="Mine", team_permission=1)
+
+        teamAUser.team = teamBUser.team
+        teamAUser.save()
+        assert feed_titles(teamAClient) == ["Mine"]
+        assert feed_titles(client_for(teamBUser)) == ["Mine"]
+        assert feed_titles(client_for(teamAMate)) == ["Team A"]
+
+    def test_joined_team_posts(self, teamAClient, teamAUser, teamBUser):
+        Post.objects.create(author=teamBUser, title="Team B", team_permission=1)
+        old = Post.objects.create(author=teamBUser, title="Old", team_permission=1)
+        Post.objects.filter(pk=old.pk).update(posted_on=timezone.now() - FEED_BACKFILL_WINDOW - timedelta(days=1))
+        Post.objects.create(author=teamBUser, title="Private")
+
+        teamAUser.team = teamBUser.team
+        teamAUser.save()
+        assert feed_titles(teamAClient) == ["Team B"]
+
+        newcomer = User.objects.create_user(email="new@email.com", username="new", password="new", team=teamBUser.team)
+        assert feed_titles(client_for(newcomer)) == ["Team B"]
+
+    def test_stale_entries_are_not_served(self, teamAClient, teamAUser, teamAMate):
+        post = Post.objects.create(author=teamAMate, title="Team", team_permission=1)
+        # Bypasses signals, the entry stays until feeds are rebuilt
+        Post.objects.filter(pk=post.pk).update(team_permission=0)
+        rebuild_post_audiences()
+
+        assert FeedEntry.objects.filter(user=teamAUser).exists()
+        assert feed_titles(teamAClient) == []
+
+    def test_anonymous(self):
+        response = APIClient().get("/api/feed/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_invalid_cursor(self, teamAClient):
+        response = teamAClient.get("/api/feed/?cursor=nope")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    # The user's entries, both broad sources, then the posts themselves
+    @pytest.mark.parametrize("posts", [10, 60])
+    def test_constant_queries(self, django_assert_num_queries, teamAClient, teamAUser, teamAMate, posts):
+        for i in range(posts):
+            Post.objects.create(author=teamAMate, title=f"Post {i}", team_permission=1, authenticated_permission=i % 2)
+        with django_assert_num_queries(4):
+            response = teamAClient.get("/api/feed/?page_size=5")
+        assert len(response.data['results']) == 5
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    return client_for(teamAUser)
+
+@pytest.fixture
+def teamAMate(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tam@email.com",
+        username="tam",
+        password="tam",
+        team = team
+    )
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
@@ -1,4 +1,8 @@
 import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management import call_command
+from django.db import connection
 from rest_framework.test import APIClient
 from user.models import CustomUser as User, Team
 from post.models import Post, Like
@@ -233,6 +237,112 @@ class TestLike:
         assert Like.objects.filter(id=like.id).exists()
 
 
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentLikes:
+    @pytest.mark.skipif(
+        connection.vendor == 'sqlite',
+        reason="SQLite's shared in-memory test database fails concurrent writers with 'table is locked'",
+    )
+    def test_concurrent_likes_create_one_row(self, defaultTeamUser, teamAUser):
+        post = Post.objects.create(
+            author=teamAUser,
+            title="Title",
+            content="Content",
+            authenticated_permission=1
+        )
+        threads = 16
+        barrier = threading.Barrier(threads)
+
+        def like(_):
+            client = APIClient()
+            client.force_authenticate(user=defaultTeamUser)
+            try:
+                barrier.wait()
+                return client.post("/api/likes/", data={"post": post.id}).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            statuses = list(executor.map(like, range(threads)))
+
+        assert statuses.count(status.HTTP_201_CREATED) == 1
+        assert statuses.count(status.HTTP_400_BAD_REQUEST) == threads - 1
+        assert Like.objects.filter(post=post, user=defaultTeamUser).count() == 1
+        post.refresh_from_db()
+        assert post.like_count == 1
+
+
+@pytest.mark.django_db
+class TestBulkLikes:
+    def test_bulk_like_and_unlike(self, defaultTeamClient, defaultTeamUser, teamAUser):
+        readable = [
+            Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+            for i in range(4)
+        ]
+        hidden = Post.objects.create(author=teamAUser, title="Title", content="Content", team_permission=1)
+        missing_id = hidden.id + 100
+        Like.objects.create(user=defaultTeamUser, post=readable[1])
+        Like.objects.create(user=defaultTeamUser, post=readable[2])
+        Post.objects.filter(id__in=[readable[1].id, readable[2].id]).update(like_count=1)
+
+        payload = {
+            "like": [readable[0].id, readable[1].id, hidden.id, missing_id],
+            "unlike": [readable[2].id, readable[3].id],
+        }
+        response = defaultTeamClient.post("/api/likes/bulk/", data=payload, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['results'] == [
+            {'post': readable[0].id, 'action': 'like', 'status': 'liked'},
+            {'post': readable[1].id, 'action': 'like', 'status': 'already liked'},
+            {'post': hidden.id, 'action': 'like', 'status': 'forbidden'},
+            {'post': missing_id, 'action': 'like', 'status': 'not found'},
+            {'post': readable[2].id, 'action': 'unlike', 'status': 'unliked'},
+            {'post': readable[3].id, 'action': 'unlike', 'status': 'not liked'},
+        ]
+
+        liked = set(Like.objects.filter(user=defaultTeamUser).values_list('post_id', flat=True))
+        assert liked == {readable[0].id, readable[1].id}
+        counts = dict(Post.objects.values_list('id', 'like_count'))
+        assert [counts[post.id] for post in readable] == [1, 1, 0, 0]
+        assert counts[hidden.id] == 0
+
+    def test_bulk_validation(self, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", public_permission=True)
+
+        response = defaultTeamClient.post("/api/likes/bulk/", data={"like": [post.id], "unlike": [post.id]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = defaultTeamClient.post("/api/likes/bulk/", data={}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = defaultTeamClient.post("/api/likes/bulk/", data={"like": ["abc"]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_anonymous_cannot_bulk_like(self, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", public_permission=True)
+        response = APIClient().post("/api/likes/bulk/", data={"like": [post.id]}, format='json')
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert not Like.objects.exists()
+
+    def test_bulk_query_count_does_not_grow(self, defaultTeamClient, teamAUser, django_assert_max_num_queries):
+        posts = Post.objects.bulk_create([
+            Post(author=teamAUser, title="Title", content="Content", excerpt="Content", public_permission=True)
+            for i in range(500)
+        ])
+        call_command('rebuild_post_audiences')
+        ids = [post.id for post in posts]
+
+        with django_assert_max_num_queries(10):
+            response = defaultTeamClient.post("/api/likes/bulk/", data={"like": ids}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert Like.objects.count() == 500
+
+        with django_assert_max_num_queries(10):
+            response = defaultTeamClient.post("/api/likes/bulk/", data={"unlike": ids}, format='json')
+        assert all(result['status'] == 'unliked' for result in response.data['results'])
+        assert not Like.objects.exists()
+
+
 class TestLikeList:
     def test_list_allowed_likes(self, defaultTeamClient, teamAUser, teamBUser, defaultTeamUser):
         teamA = Team.objects.get(name="default_team")
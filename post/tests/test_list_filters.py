@@ -0,0 +1,152 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Like, Comment
+from rest_framework import status
+
+
+def list_titles(client, params):
+    response = client.get(f"/api/posts/{params}")
+    assert response.status_code == status.HTTP_200_OK
+    return sorted(post['title'] for post in response.data['results'])
+
+
+@pytest.mark.django_db
+class TestPostFilters:
+    def test_filter_by_author_and_team(self, teamAClient, teamAUser, teamAMember, teamBUser):
+        Post.objects.create(author=teamAUser, title="Own", content="Content")
+        Post.objects.create(author=teamAMember, title="Member", content="Content", team_permission=1)
+        Post.objects.create(author=teamBUser, title="Team B", content="Content", authenticated_permission=1)
+        Post.objects.create(author=teamBUser, title="Hidden", content="Content")
+
+        assert list_titles(teamAClient, f"?author={teamAMember.id}") == ["Member"]
+        assert list_titles(teamAClient, f"?team={teamAUser.team_id}") == ["Member", "Own"]
+        # Filters never widen access
+        assert list_titles(teamAClient, f"?team={teamBUser.team_id}") == ["Team B"]
+
+    def test_filter_by_posted_on(self, teamAClient, teamAUser):
+        now = timezone.now()
+        for days in range(4):
+            Post.objects.filter(pk=Post.objects.create(author=teamAUser, title=f"{days} days", content="Content").pk) \
+                .update(posted_on=now - timedelta(days=days))
+
+        after = (now - timedelta(days=2, hours=1)).isoformat()
+        before = (now - timedelta(hours=1)).isoformat()
+        params = {'posted_on_after': after, 'posted_on_before': before}
+        response = teamAClient.get("/api/posts/", params)
+        assert sorted(post['title'] for post in response.data['results']) == ["1 days", "2 days"]
+        assert list_titles(teamAClient, f"?posted_on_after={now.date().isoformat()}") == ["0 days"]
+
+    def test_filter_by_visibility(self, teamAClient, teamAUser):
+        Post.objects.create(author=teamAUser, title="Public", content="Content", public_permission=True)
+        Post.objects.create(author=teamAUser, title="Authenticated", content="Content", authenticated_permission=1)
+        Post.objects.create(author=teamAUser, title="Team", content="Content", team_permission=2)
+        Post.objects.create(author=teamAUser, title="Private", content="Content")
+
+        assert list_titles(teamAClient, "?visibility=public") == ["Public"]
+        assert list_titles(teamAClient, "?visibility=authenticated") == ["Authenticated"]
+        assert list_titles(teamAClient, "?visibility=team") == ["Team"]
+        assert list_titles(teamAClient, "?visibility=private") == ["Private"]
+
+    def test_filters_combine_with_cursor_pages(self, teamAClient, teamAUser, teamBUser):
+        for i in range(5):
+            Post.objects.create(author=teamAUser, title=f"Own {i}", content="Content")
+            Post.objects.create(author=teamBUser, title=f"Other {i}", content="Content", public_permission=True)
+
+        response = teamAClient.get(f"/api/posts/?author={teamAUser.id}&page_size=3&cursor=")
+        titles = [post['title'] for post in response.data['results']]
+        response = teamAClient.get(response.data['next page'])
+        titles += [post['title'] for post in response.data['results']]
+        assert titles == [f"Own {i}" for i in reversed(range(5))]
+
+    def test_filtered_anonymous_list_is_not_cached(self, teamAUser):
+        Post.objects.create(author=teamAUser, title="Public", content="Content", public_permission=True)
+        response = APIClient().get(f"/api/posts/?author={teamAUser.id}")
+        assert [post['title'] for post in response.data['results']] == ["Public"]
+        assert 'X-Cache' not in response
+
+    def test_filtered_export(self, teamAClient, teamAUser, teamBUser):
+        Post.objects.create(author=teamAUser, title="Own", content="Content")
+        Post.objects.create(author=teamBUser, title="Public", content="Content", public_permission=True)
+
+        response = teamAClient.get("/api/posts/export/?visibility=public")
+        assert b'"Public"' in b''.join(response.streaming_content)
+
+    @pytest.mark.parametrize("params, field", [
+        ("?author=x", 'author'),
+        ("?posted_on_after=yesterday", 'posted_on'),
+        ("?visibility=secret", 'visibility'),
+    ])
+    def test_invalid_filters(self, teamAClient, params, field):
+        response = teamAClient.get(f"/api/posts/{params}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(response.data) == [field]
+
+
+@pytest.mark.django_db
+class TestLikeAndCommentFilters:
+    def test_filter_by_date(self, teamAClient, teamAUser, teamBUser):
+        now = timezone.now()
+        post = Post.objects.create(author=teamAUser, title="Own", content="Content")
+        Like.objects.create(user=teamAUser, post=post)
+        Like.objects.create(user=teamBUser, post=post)
+        Like.objects.filter(user=teamBUser).update(liked_at=now - timedelta(days=3))
+        Comment.objects.create(user=teamAUser, post=post, content="Recent")
+        Comment.objects.filter(pk=Comment.objects.create(user=teamAUser, post=post, content="Old").pk) \
+            .update(commented_at=now - timedelta(days=3))
+
+        since = (now - timedelta(days=1)).isoformat()
+        response = teamAClient.get("/api/likes/", {'liked_at_after': since})
+        assert [like['user'] for like in response.data['results']] == [teamAUser.id]
+        response = teamAClient.get("/api/likes/", {'post': post.id, 'liked_at_before': since})
+        assert [like['user'] for like in response.data['results']] == [teamBUser.id]
+
+        response = teamAClient.get("/api/comments/", {'commented_at_after': since})
+        assert [comment['content'] for comment in response.data['results']] == ["Recent"]
+        response = teamAClient.get("/api/comments/", {'user': teamAUser.id, 'commented_at_before': since})
+        assert [comment['content'] for comment in response.data['results']] == ["Old"]
+
+    def test_invalid_date(self, teamAClient):
+        response = teamAClient.get("/api/comments/?commented_at_after=soon")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert list(response.data) == ['commented_at']
+
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAMember(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tam@email.com",
+        username="tam",
+        password="tam",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
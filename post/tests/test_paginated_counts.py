@@ -0,0 +1,140 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Like
+from rest_framework import status
+
+
+def create_liked_posts(author, likers, posts=3):
+    for i in range(posts):
+        post = Post.objects.create(author=author, title=f"Title {i}", content="Content", authenticated_permission=1)
+        for liker in likers:
+            Like.objects.create(user=liker, post=post)
+
+
+@pytest.mark.django_db
+class TestPaginatedCounts:
+    def test_count_is_cached(self, defaultTeamClient, teamAUser, teamBUser):
+        create_liked_posts(teamAUser, [teamAUser, teamBUser])
+
+        with CaptureQueriesContext(connection) as first:
+            response = defaultTeamClient.get("/api/likes/")
+        assert response.data['count'] == 6
+
+        with CaptureQueriesContext(connection) as second:
+            response = defaultTeamClient.get("/api/likes/")
+        assert response.data['count'] == 6
+        assert len(second) == len(first) - 1
+        assert not any('COUNT(' in query['sql'] for query in second.captured_queries)
+
+    def test_cached_count_invalidated_on_write(self, defaultTeamClient, defaultTeamUser, teamAUser, teamBUser):
+        create_liked_posts(teamAUser, [teamAUser, teamBUser])
+        response = defaultTeamClient.get("/api/likes/")
+        assert response.data['count'] == 6
+
+        response = defaultTeamClient.post("/api/likes/", data={"post": Post.objects.first().id})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = defaultTeamClient.get("/api/likes/")
+        assert response.data['count'] == 7
+
+        Like.objects.filter(user=teamBUser).delete()
+        response = defaultTeamClient.get("/api/likes/")
+        assert response.data['count'] == 4
+
+    def test_post_count_survives_likes_and_comments(self, defaultTeamClient, teamAUser):
+        create_liked_posts(teamAUser, [teamAUser])
+        etag = defaultTeamClient.get("/api/posts/")['ETag']
+
+        post = Post.objects.first()
+        defaultTeamClient.post("/api/likes/", data={"post": post.id})
+        defaultTeamClient.post("/api/comments/", data={"post": post.id, "content": "Comment"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = defaultTeamClient.get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+        # The counters shown changed, the number of posts did not
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 3
+        assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+
+    def test_cached_count_invalidated_on_visibility_change(self, defaultTeamClient, teamAUser):
+        create_liked_posts(teamAUser, [teamAUser])
+        response = defaultTeamClient.get("/api/posts/")
+        assert response.data['count'] == 3
+
+        post = Post.objects.first()
+        post.authenticated_permission = 0
+        post.save()
+
+        response = defaultTeamClient.get("/api/posts/")
+        assert response.data['count'] == 2
+
+    def test_count_false_skips_count(self, defaultTeamClient, teamAUser, teamBUser):
+        create_liked_posts(teamAUser, [teamAUser, teamBUser], posts=15)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = defaultTeamClient.get("/api/likes/?count=false")
+        assert response.status_code == status.HTTP_200_OK
+        assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+        assert response.data['count'] is None
+        assert response.data['pages'] is None
+        assert response.data['current page'] == 1
+        assert len(response.data['results']) == 20
+        assert response.data['prev page'] is None
+        assert 'count=false' in response.data['next page']
+
+        response = defaultTeamClient.get(response.data['next page'])
+        assert len(response.data['results']) == 10
+        assert response.data['next page'] is None
+        assert response.data['prev page'] is not None
+
+        response = defaultTeamClient.get("/api/likes/?count=false&page=3")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_count_estimate(self, defaultTeamClient, teamAUser):
+        create_liked_posts(teamAUser, [teamAUser], posts=15)
+
+        response = defaultTeamClient.get("/api/posts/?count=estimate")
+        assert response.status_code == status.HTTP_200_OK
+        # Small sets always get an exact count
+        assert response.data['count'] == 15
+        assert response.data['pages'] == 2
+        assert len(response.data['results']) == 10
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
@@ -0,0 +1,148 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db.models import Q
+from user.models import CustomUser as User, Team
+from post.models import Post, PostAudience
+from post.filters import PostAccessFilter
+
+
+# The OR/DISTINCT filter the visibility index replaced, kept as the reference
+def legacy_accessible_posts_for(user):
+    if not user.is_authenticated:
+        return Post.objects.filter(public_permission=True)
+    if hasattr(user, 'role') and user.role == 'admin':
+        return Post.objects.all()
+    return Post.objects.filter(
+        Q(author=user) |
+        Q(author__team=user.team, team_permission__gte=1) |
+        Q(authenticated_permission__gte=1) |
+        Q(public_permission=True)
+    ).distinct()
+
+
+def assert_same_posts(user):
+    expected = sorted(legacy_accessible_posts_for(user).values_list('id', flat=True))
+    accessible = PostAccessFilter.get_accessible_posts_for(user)
+    assert not accessible.query.distinct
+    assert sorted(accessible.values_list('id', flat=True)) == expected
+
+
+def create_posts_for_every_permission(authors):
+    for author in authors:
+        for i in (0, 1, 2):
+            for j in (0, 1, 2):
+                for k in (True, False):
+                    Post.objects.create(
+                        author=author,
+                        title="Title",
+                        content="Content",
+                        authenticated_permission=i,
+                        team_permission=j,
+                        public_permission=k,
+                    )
+
+
+@pytest.mark.django_db
+class TestPostAudiences:
+    def test_index_matches_legacy_filter(self, users):
+        create_posts_for_every_permission(users)
+
+        for user in users + [AnonymousUser()]:
+            assert_same_posts(user)
+
+    def test_author_team_change(self, users, teamAUser, defaultTeamUser):
+        create_posts_for_every_permission(users)
+
+        teamAUser.team = defaultTeamUser.team
+        teamAUser.save()
+
+        for user in users:
+            user.refresh_from_db()
+            assert_same_posts(user)
+
+    def test_team_deleted(self, users, teamBUser):
+        create_posts_for_every_permission(users)
+
+        teamBUser.team.delete()
+
+        for user in users:
+            user.refresh_from_db()
+            assert_same_posts(user)
+        teamBUser.refresh_from_db()
+        assert teamBUser.team is None
+
+    def test_permission_change(self, users, teamAUser):
+        create_posts_for_every_permission(users)
+
+        for post in Post.objects.filter(author=teamAUser):
+            post.public_permission = not post.public_permission
+            post.authenticated_permission = (post.authenticated_permission + 1) % 3
+            post.team_permission = (post.team_permission + 2) % 3
+            post.save()
+
+        for user in users:
+            assert_same_posts(user)
+
+    def test_rebuild_command(self, users):
+        create_posts_for_every_permission(users)
+        expected = sorted(PostAudience.objects.values_list('post_id', 'key'))
+
+        PostAudience.objects.all().delete()
+        call_command('rebuild_post_audiences')
+
+        assert sorted(PostAudience.objects.values_list('post_id', 'key')) == expected
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
+
+@pytest.fixture
+def users(defaultTeamUser, teamAUser, teamBUser):
+    anotherTeamAUser = User.objects.create_user(
+        email="atau@email.com",
+        username="atau",
+        password="atau",
+        team=teamAUser.team
+    )
+    teamlessUser = User.objects.create_user(
+        email="tlu@email.com",
+        username="tlu",
+        password="tlu",
+        team=Team.objects.create(name="Team C")
+    )
+    Team.objects.get(name="Team C").delete()
+    teamlessUser.refresh_from_db()
+    admin = User.objects.create_user(
+        email="admin@email.com",
+        username="admin",
+        password="admin",
+        role="admin"
+    )
+    return [defaultTeamUser, teamAUser, teamBUser, anotherTeamAUser, teamlessUser, admin]
@@ -0,0 +1,109 @@
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Like, Comment
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestPostCounters:
+    def test_like_and_unlike_update_like_count(self, defaultTeamClient, teamAClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+
+        defaultTeamClient.post("/api/likes/", data={"post": post.id})
+        response = teamAClient.post("/api/likes/", data={"post": post.id})
+        assert response.status_code == status.HTTP_201_CREATED
+        post.refresh_from_db()
+        assert post.like_count == 2
+
+        response = teamAClient.delete(f"/api/likes/{response.data['id']}/")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        post.refresh_from_db()
+        assert post.like_count == 1
+
+    def test_failed_like_does_not_count(self, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", team_permission=1)
+
+        response = defaultTeamClient.post("/api/likes/", data={"post": post.id})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        post.refresh_from_db()
+        assert post.like_count == 0
+
+    def test_comment_and_delete_update_comment_count(self, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+
+        for i in range(3):
+            response = defaultTeamClient.post("/api/comments/", data={"post": post.id, "content": f"Comment {i}"})
+            assert response.status_code == status.HTTP_201_CREATED
+        post.refresh_from_db()
+        assert post.comment_count == 3
+
+        defaultTeamClient.delete(f"/api/comments/{response.data['id']}/")
+        post.refresh_from_db()
+        assert post.comment_count == 2
+
+    def test_counts_exposed_and_read_only(self, defaultTeamClient, defaultTeamUser, teamAUser):
+        post = Post.objects.create(author=defaultTeamUser, title="Title", content="Content", authenticated_permission=1)
+        defaultTeamClient.post("/api/likes/", data={"post": post.id})
+        defaultTeamClient.post("/api/comments/", data={"post": post.id, "content": "Comment"})
+
+        response = defaultTeamClient.get(f"/api/posts/{post.id}/")
+        assert response.data['like_count'] == 1
+        assert response.data['comment_count'] == 1
+
+        response = defaultTeamClient.patch(f"/api/posts/{post.id}/", data={"like_count": 100, "comment_count": 100})
+        assert response.status_code == status.HTTP_200_OK
+        post.refresh_from_db()
+        assert post.like_count == 1
+        assert post.comment_count == 1
+
+    def test_reconcile_command_fixes_drift(self, defaultTeamUser, teamAUser):
+        posts = []
+        for i in range(5):
+            post = Post.objects.create(author=teamAUser, title="Title", content="Content", public_permission=True)
+            Like.objects.create(user=teamAUser, post=post)
+            Comment.objects.create(user=defaultTeamUser, post=post, content="Comment")
+            posts.append(post)
+        Post.objects.filter(id=posts[0].id).update(like_count=7)
+        Post.objects.filter(id=posts[3].id).update(comment_count=0)
+
+        call_command('reconcile_post_counts', '--batch-size', '2', '--dry-run')
+        assert Post.objects.get(id=posts[0].id).like_count == 7
+
+        call_command('reconcile_post_counts', '--batch-size', '2')
+        for post in Post.objects.all():
+            assert post.like_count == 1
+            assert post.comment_count == 1
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
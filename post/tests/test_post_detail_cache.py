@@ -0,0 +1,118 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.caching import post_detail_stats
+from post.models import Post
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestPostDetailCache:
+    def test_second_read_is_served_from_cache(self, defaultTeamClient, teamAUser, django_assert_num_queries):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        first = defaultTeamClient.get(f"/api/posts/{post.id}/")
+        assert first.status_code == status.HTTP_200_OK
+
+        with django_assert_num_queries(0):
+            second = defaultTeamClient.get(f"/api/posts/{post.id}/")
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data == first.data
+        assert post_detail_stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    def test_cached_body_is_not_served_to_other_audiences(self, teamAClient, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", team_permission=1)
+        assert teamAClient.get(f"/api/posts/{post.id}/").status_code == status.HTTP_200_OK
+
+        response = defaultTeamClient.get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        response = APIClient().get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+        assert post_detail_stats()['hits'] == 2
+
+    def test_update_invalidates(self, teamAClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        teamAClient.get(f"/api/posts/{post.id}/")
+
+        teamAClient.patch(f"/api/posts/{post.id}/", data={"content": "Edited", "authenticated_permission": 1})
+        response = teamAClient.get(f"/api/posts/{post.id}/")
+        assert response.data['content'] == "Edited"
+
+    def test_permission_change_invalidates(self, teamAClient, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        assert defaultTeamClient.get(f"/api/posts/{post.id}/").status_code == status.HTTP_200_OK
+
+        post.authenticated_permission = 0
+        post.team_permission = 1
+        post.save()
+        assert defaultTeamClient.get(f"/api/posts/{post.id}/").status_code == status.HTTP_403_FORBIDDEN
+        assert teamAClient.get(f"/api/posts/{post.id}/").status_code == status.HTTP_200_OK
+
+    def test_like_updates_cached_count(self, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        assert defaultTeamClient.get(f"/api/posts/{post.id}/").data['like_count'] == 0
+
+        defaultTeamClient.post("/api/likes/", data={"post": post.id})
+        assert defaultTeamClient.get(f"/api/posts/{post.id}/").data['like_count'] == 1
+
+    def test_author_team_change_invalidates(self, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", team_permission=1)
+        assert defaultTeamClient.get(f"/api/posts/{post.id}/").status_code == status.HTTP_403_FORBIDDEN
+        teamAUser.team = Team.objects.get(name="default_team")
+        teamAUser.save()
+        assert defaultTeamClient.get(f"/api/posts/{post.id}/").status_code == status.HTTP_200_OK
+
+        teamAUser.team = Team.objects.get(name="Team A")
+        teamAUser.save()
+        assert defaultTeamClient.get(f"/api/posts/{post.id}/").status_code == status.HTTP_403_FORBIDDEN
+
+    def test_delete_invalidates(self, teamAClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", public_permission=True)
+        assert APIClient().get(f"/api/posts/{post.id}/").status_code == status.HTTP_200_OK
+
+        teamAClient.delete(f"/api/posts/{post.id}/")
+        assert APIClient().get(f"/api/posts/{post.id}/").status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stats_command(self, defaultTeamClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", authenticated_permission=1)
+        for _ in range(4):
+            defaultTeamClient.get(f"/api/posts/{post.id}/")
+
+        output = io.StringIO()
+        call_command('post_cache_stats', '--reset', stdout=output)
+        assert "3 hits, 1 misses, hit rate 75.0%" in output.getvalue()
+        assert post_detail_stats()['hits'] == 0
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
@@ -0,0 +1,120 @@
+import gzip
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post import renderers
+from post.models import Post
+from rest_framework import status
+
+
+def read_lines(response):
+    body = b''.join(response.streaming_content)
+    if response.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return [json.loads(line) for line in body.decode().splitlines()]
+
+
+@pytest.mark.django_db
+class TestPostExport:
+    def test_export_accessible_posts(self, teamAClient, teamAUser, teamBUser):
+        visible = [
+            Post.objects.create(author=teamAUser, title="Own", content="Content"),
+            Post.objects.create(author=teamBUser, title="Authenticated", content="Content", authenticated_permission=1),
+            Post.objects.create(author=teamBUser, title="Public", content="Content", public_permission=True),
+        ]
+        Post.objects.create(author=teamBUser, title="Team B", content="Content", team_permission=1)
+
+        response = teamAClient.get("/api/posts/export/")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == "application/x-ndjson"
+        rows = read_lines(response)
+        assert [row['id'] for row in rows] == [post.id for post in reversed(visible)]
+        assert rows[0]['content'] == "Content"
+        assert rows[0]['username'] == "tbu"
+
+    def test_anonymous_export(self, teamAUser):
+        Post.objects.create(author=teamAUser, title="Public", content="Content", public_permission=True)
+        Post.objects.create(author=teamAUser, title="Private", content="Content", authenticated_permission=1)
+
+        rows = read_lines(APIClient().get("/api/posts/export/"))
+        assert [row['title'] for row in rows] == ["Public"]
+
+    def test_export_fields(self, teamAClient, teamAUser):
+        Post.objects.create(author=teamAUser, title="Title", content="Content", excerpt="Excerpt")
+        rows = read_lines(teamAClient.get("/api/posts/export/?fields=id,excerpt"))
+        assert list(rows[0]) == ['id', 'excerpt']
+        assert rows[0]['excerpt'] == "Excerpt"
+
+        response = teamAClient.get("/api/posts/export/?fields=secret")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert json.loads(response.content) == {'detail': "Unknown fields: secret."}
+
+    def test_gzip_export(self, teamAClient, teamAUser, monkeypatch):
+        monkeypatch.setattr(renderers, 'STREAM_BUFFER_SIZE', 100)
+        for i in range(20):
+            Post.objects.create(author=teamAUser, title=f"Title {i}", content="Content")
+
+        response = teamAClient.get("/api/posts/export/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        assert response['Content-Encoding'] == "gzip"
+        assert 'Accept-Encoding' in response['Vary']
+        rows = read_lines(response)
+        assert [row['title'] for row in rows] == [f"Title {i}" for i in reversed(range(20))]
+
+    @pytest.mark.parametrize("accept_encoding, gzipped", [
+        ("gzip;q=0", False),
+        ("gzip; q=0.0, deflate", False),
+        ("*;q=0", False),
+        ("deflate", False),
+        ("GZIP;q=0.5", True),
+        ("*", True),
+        ("gzip;q=0, *", False),
+    ])
+    def test_gzip_quality(self, teamAClient, teamAUser, accept_encoding, gzipped):
+        Post.objects.create(author=teamAUser, title="Title", content="Content")
+        response = teamAClient.get("/api/posts/export/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        assert (response.get('Content-Encoding') == "gzip") is gzipped
+        assert [row['title'] for row in read_lines(response)] == ["Title"]
+
+    def test_export_streams_from_one_query(self, teamAClient, teamAUser, monkeypatch):
+        monkeypatch.setattr(renderers, 'STREAM_BUFFER_SIZE', 100)
+        for i in range(50):
+            Post.objects.create(author=teamAUser, title=f"Title {i}", content="Content")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = teamAClient.get("/api/posts/export/")
+            chunks = list(response.streaming_content)
+        assert len(chunks) > 1
+        assert len(queries) == 1
+        assert 'OFFSET' not in queries[0]['sql'] and 'COUNT(' not in queries[0]['sql']
+
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
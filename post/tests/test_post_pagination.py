@@ -0,0 +1,105 @@
+import pytest
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestPostCursorPagination:
+    def test_walk_all_pages(self, defaultTeamClient, teamAUser):
+        for i in range(25):
+            Post.objects.create(author=teamAUser, title=f"Title {i}", content="Content", authenticated_permission=1)
+        # Hidden posts must not show up in any page
+        for i in range(5):
+            Post.objects.create(author=teamAUser, title="Private", content="Content")
+        expected = list(
+            Post.objects.filter(authenticated_permission=1).order_by('-posted_on', '-id').values_list('id', flat=True)
+        )
+
+        response = defaultTeamClient.get("/api/posts/?cursor=&page_size=10")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['prev page'] is None
+        assert 'count' not in response.data
+
+        seen = []
+        pages = 0
+        while True:
+            seen += [post['id'] for post in response.data['results']]
+            pages += 1
+            if response.data['next page'] is None:
+                break
+            response = defaultTeamClient.get(response.data['next page'])
+            assert response.status_code == status.HTTP_200_OK
+
+        assert pages == 3
+        assert seen == expected
+
+    def test_previous_page(self, defaultTeamClient, teamAUser):
+        for i in range(25):
+            Post.objects.create(author=teamAUser, title=f"Title {i}", content="Content", public_permission=True)
+
+        first = defaultTeamClient.get("/api/posts/?cursor=&page_size=10")
+        second = defaultTeamClient.get(first.data['next page'])
+        assert second.data['prev page'] is not None
+
+        back = defaultTeamClient.get(second.data['prev page'])
+        assert back.status_code == status.HTTP_200_OK
+        assert [post['id'] for post in back.data['results']] == [post['id'] for post in first.data['results']]
+        assert back.data['prev page'] is None
+        assert back.data['next page'] is not None
+
+    def test_same_timestamp_posts_are_not_skipped(self, defaultTeamClient, teamAUser):
+        for i in range(15):
+            Post.objects.create(author=teamAUser, title=f"Title {i}", content="Content", public_permission=True)
+        posted_on = Post.objects.first().posted_on
+        Post.objects.update(posted_on=posted_on)
+
+        response = defaultTeamClient.get("/api/posts/?cursor=&page_size=4")
+        seen = [post['id'] for post in response.data['results']]
+        while response.data['next page'] is not None:
+            response = defaultTeamClient.get(response.data['next page'])
+            seen += [post['id'] for post in response.data['results']]
+
+        assert seen == sorted(Post.objects.values_list('id', flat=True), reverse=True)
+
+    def test_invalid_cursor(self, defaultTeamClient):
+        response = defaultTeamClient.get("/api/posts/?cursor=not-a-cursor")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_page_number_mode_unchanged(self, defaultTeamClient, teamAUser):
+        for i in range(15):
+            Post.objects.create(author=teamAUser, title=f"Title {i}", content="Content", public_permission=True)
+
+        response = defaultTeamClient.get("/api/posts/?page=2")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['current page'] == 2
+        assert response.data['pages'] == 2
+        assert response.data['count'] == 15
+        assert len(response.data['results']) == 5
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
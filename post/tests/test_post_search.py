@@ -0,0 +1,141 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post
+from rest_framework import status
+
+
+def search_titles(client, params):
+    response = client.get(f"/api/posts/search/{params}")
+    assert response.status_code == status.HTTP_200_OK
+    return [post['title'] for post in response.data['results']]
+
+
+# Fails when the full-text index no longer follows the posts, e.g. when a later
+# migration rebuilt post_post on SQLite and dropped its triggers
+def assert_search_index_in_sync():
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT tgname FROM pg_trigger WHERE tgrelid = 'post_post'::regclass AND NOT tgisinternal"
+            )
+            assert 'post_search_document' in {row[0] for row in cursor.fetchall()}
+            cursor.execute(
+                "SELECT count(*) FROM post_post "
+                "WHERE search_document IS DISTINCT FROM post_search_document(title, content)"
+            )
+            assert cursor.fetchone()[0] == 0
+        else:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'post_post'")
+            assert {'post_search_insert', 'post_search_update', 'post_search_delete'} <= {row[0] for row in cursor.fetchall()}
+            # A rank of 1 also compares the index with the content table
+            cursor.execute("INSERT INTO post_search (post_search, rank) VALUES ('integrity-check', 1)")
+
+
+@pytest.mark.django_db
+class TestPostSearch:
+    def test_search_accessible_posts(self, teamAClient, teamAUser, teamBUser):
+        Post.objects.create(author=teamAUser, title="Own garden", content="Tomatoes")
+        Post.objects.create(author=teamBUser, title="Shared garden", content="Beans", authenticated_permission=1)
+        Post.objects.create(author=teamBUser, title="Public garden", content="Roses", public_permission=True)
+        Post.objects.create(author=teamBUser, title="Team B garden", content="Leeks", team_permission=1)
+        Post.objects.create(author=teamAUser, title="Kitchen", content="Recipes")
+
+        assert sorted(search_titles(teamAClient, "?q=garden")) == ["Own garden", "Public garden", "Shared garden"]
+        assert search_titles(APIClient(), "?q=garden") == ["Public garden"]
+
+    def test_every_term_matches(self, teamAClient, teamAUser):
+        Post.objects.create(author=teamAUser, title="Garden", content="Tomatoes and beans")
+        Post.objects.create(author=teamAUser, title="Garden", content="Roses")
+
+        response = teamAClient.get("/api/posts/search/?q=garden beans")
+        assert [post['content'] for post in response.data['results']] == ["Tomatoes and beans"]
+        # Words are stemmed
+        assert len(search_titles(teamAClient, "?q=bean")) == 1
+
+    def test_title_matches_rank_first(self, teamAClient, teamAUser):
+        Post.objects.create(author=teamAUser, title="Notes", content="A few words about compost")
+        Post.objects.create(author=teamAUser, title="Compost", content="A few words")
+
+        assert search_titles(teamAClient, "?q=compost") == ["Compost", "Notes"]
+
+    def test_edits_and_deletes_are_indexed(self, teamAClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Draft", content="Content")
+        post.title = "Orchard"
+        post.save()
+        assert search_titles(teamAClient, "?q=orchard") == ["Orchard"]
+        assert search_titles(teamAClient, "?q=draft") == []
+
+        Post.objects.filter(pk=post.pk).update(content="Apples")
+        assert search_titles(teamAClient, "?q=apples") == ["Orchard"]
+        post.delete()
+        assert search_titles(teamAClient, "?q=orchard") == []
+
+    def test_index_follows_every_write(self, teamAUser):
+        posts = [Post.objects.create(author=teamAUser, title=f"Title {i}", content="Content") for i in range(3)]
+        posts[0].content = "Edited"
+        posts[0].save()
+        Post.objects.filter(pk=posts[1].pk).update(title="Updated", excerpt="Updated")
+        posts[2].delete()
+        Post.objects.bulk_create([Post(author=teamAUser, title="Bulk", content="Content", excerpt="Content")])
+        assert_search_index_in_sync()
+
+    def test_snippet_highlights_excerpt(self, teamAClient):
+        response = teamAClient.post("/api/posts/", data={
+            "title": "Garden", "content": "Grow <b>tomatoes</b> in the garden", "team_permission": 1,
+        })
+        assert response.status_code == status.HTTP_201_CREATED
+
+        response = teamAClient.get("/api/posts/search/?q=garden&fields=id,title")
+        result, = response.data['results']
+        assert list(result) == ['id', 'title', 'snippet']
+        # The excerpt is escaped, only the marks are HTML
+        assert result['snippet'] == "Grow &lt;b&gt;tomatoes&lt;/b&gt; in the <mark>garden</mark>"
+
+    def test_query_syntax_is_not_interpreted(self, teamAClient, teamAUser):
+        Post.objects.create(author=teamAUser, title="Garden", content="Beans")
+
+        assert search_titles(teamAClient, '?q="garden" OR NEAR(') == []
+        assert search_titles(teamAClient, '?q=garden*') == ["Garden"]
+
+    def test_missing_query(self, teamAClient):
+        for params in ["", "?q=", "?q=%20-*"]:
+            response = teamAClient.get(f"/api/posts/search/{params}")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.data == {'detail': "Missing search query."}
+
+    def test_paginated(self, teamAClient, teamAUser):
+        for i in range(15):
+            Post.objects.create(author=teamAUser, title=f"Garden {i}", content="Content")
+
+        response = teamAClient.get("/api/posts/search/?q=garden&page=2")
+        assert response.data['count'] == 15
+        assert len(response.data['results']) == 5
+
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
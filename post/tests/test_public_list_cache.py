@@ -0,0 +1,136 @@
+import json
+
+import pytest
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post import caching
+from post.caching import claim_public_list_rebuild, public_list_key
+from post.models import Post
+from rest_framework import status
+
+
+def titles(response):
+    return [post['title'] for post in json.loads(response.content)['results']]
+
+
+# Cache key of the page a freshly built response belongs to
+def page_key(response):
+    assert response['X-Cache'] == "MISS"
+    return public_list_key(response.renderer_context['request'])
+
+
+@pytest.mark.django_db
+class TestPublicListCache:
+    def test_second_request_is_served_from_cache(self, anonymousClient, teamAUser, django_assert_num_queries):
+        create_posts(teamAUser, 3)
+        first = anonymousClient.get("/api/posts/")
+        assert first['X-Cache'] == "MISS"
+
+        with django_assert_num_queries(0):
+            second = anonymousClient.get("/api/posts/")
+        assert second.status_code == status.HTTP_200_OK
+        assert second['X-Cache'] == "HIT"
+        assert second.content == first.content
+        assert second['Content-Type'] == "application/json"
+
+    def test_pages_are_cached_separately(self, anonymousClient, teamAUser):
+        create_posts(teamAUser, 3)
+        assert titles(anonymousClient.get("/api/posts/?page_size=2")) == ["Post 2", "Post 1"]
+        assert titles(anonymousClient.get("/api/posts/?page_size=2&page=2")) == ["Post 0"]
+        assert titles(anonymousClient.get("/api/posts/?page_size=2")) == ["Post 2", "Post 1"]
+
+    def test_only_plain_anonymous_pages_are_cached(self, anonymousClient, teamAClient, teamAUser):
+        create_posts(teamAUser, 3)
+        for client, url in [(teamAClient, "/api/posts/"), (anonymousClient, "/api/posts/?count=false")]:
+            client.get(url)
+            assert 'X-Cache' not in client.get(url)
+
+    def test_new_public_post_invalidates(self, anonymousClient, teamAUser):
+        create_posts(teamAUser, 2)
+        anonymousClient.get("/api/posts/")
+
+        Post.objects.create(author=teamAUser, title="New", content="Content", public_permission=True)
+        response = anonymousClient.get("/api/posts/")
+        assert response['X-Cache'] == "MISS"
+        assert titles(response)[0] == "New"
+
+        # Posts that are not public do not touch the cached pages
+        Post.objects.create(author=teamAUser, title="Private", content="Content", team_permission=1)
+        assert anonymousClient.get("/api/posts/")['X-Cache'] == "HIT"
+
+    def test_stale_page_served_during_rebuild(self, anonymousClient, teamAUser):
+        posts = create_posts(teamAUser, 2)
+        key = page_key(anonymousClient.get("/api/posts/"))
+
+        posts[0].title = "Edited"
+        posts[0].save()
+        # Another request is rebuilding the page
+        assert claim_public_list_rebuild(key)
+        response = anonymousClient.get("/api/posts/")
+        assert response['X-Cache'] == "STALE"
+        assert "Edited" not in titles(response)
+
+    def test_rebuilt_once_after_invalidation(self, anonymousClient, teamAUser, django_assert_num_queries):
+        posts = create_posts(teamAUser, 2)
+        anonymousClient.get("/api/posts/")
+        posts[0].title = "Edited"
+        posts[0].save()
+
+        assert anonymousClient.get("/api/posts/")['X-Cache'] == "MISS"
+        with django_assert_num_queries(0):
+            response = anonymousClient.get("/api/posts/")
+        assert response['X-Cache'] == "HIT"
+        assert "Edited" in titles(response)
+
+    def test_expired_page_is_rebuilt(self, anonymousClient, teamAUser, monkeypatch):
+        create_posts(teamAUser, 2)
+        monkeypatch.setattr(caching, 'PUBLIC_LIST_FRESH', -1)
+        anonymousClient.get("/api/posts/")
+        assert anonymousClient.get("/api/posts/")['X-Cache'] == "MISS"
+
+    def test_revoked_post_is_never_served_stale(self, anonymousClient, teamAUser):
+        posts = create_posts(teamAUser, 2)
+        key = page_key(anonymousClient.get("/api/posts/"))
+
+        posts[1].public_permission = False
+        posts[1].save()
+        assert claim_public_list_rebuild(key)
+        response = anonymousClient.get("/api/posts/")
+        assert response['X-Cache'] == "MISS"
+        assert titles(response) == ["Post 0"]
+
+    def test_deleted_post_is_never_served_stale(self, anonymousClient, teamAUser):
+        posts = create_posts(teamAUser, 2)
+        key = page_key(anonymousClient.get("/api/posts/"))
+
+        posts[1].delete()
+        assert claim_public_list_rebuild(key)
+        assert titles(anonymousClient.get("/api/posts/")) == ["Post 0"]
+
+
+def create_posts(author, count):
+    return [
+        Post.objects.create(author=author, title=f"Post {i}", content="Content", public_permission=True)
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def anonymousClient():
+    return APIClient()
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
@@ -0,0 +1,154 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Like, Comment
+from rest_framework import status
+
+# Fixed number of SQL statements per endpoint and action, whatever the page size.
+# Lists are measured with a cold count cache; savepoints around writes are included.
+# Post writes that change the audience also rewrite the post's feed entries, likes
+# and comments update the post's trending score.
+QUERY_BUDGETS = {
+    ('posts', 'list'): 2,
+    ('posts', 'retrieve'): 1,
+    ('posts', 'create'): 4,
+    ('posts', 'update'): 6,
+    ('posts', 'destroy'): 9,
+    ('likes', 'list'): 2,
+    ('likes', 'list by post'): 3,
+    ('likes', 'list by user'): 3,
+    ('likes', 'list by post and user'): 3,
+    ('likes', 'retrieve'): 1,
+    ('likes', 'create'): 6,
+    ('likes', 'destroy'): 6,
+    ('comments', 'list'): 2,
+    ('comments', 'list by post'): 3,
+    ('comments', 'list by user'): 3,
+    ('comments', 'list by post and user'): 3,
+    ('comments', 'retrieve'): 1,
+    ('comments', 'create'): 6,
+    ('comments', 'destroy'): 6,
+}
+
+PAGE_SIZES = [1, 10, 100]
+
+
+@pytest.fixture
+def assert_query_budget(django_assert_num_queries):
+    def check(endpoint, action, request):
+        cache.clear()
+        with django_assert_num_queries(QUERY_BUDGETS[(endpoint, action)]):
+            return request()
+    return check
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    @pytest.mark.parametrize("endpoint", ['posts', 'likes', 'comments'])
+    @pytest.mark.parametrize("page_size", PAGE_SIZES)
+    def test_list(self, assert_query_budget, defaultTeamClient, authors, endpoint, page_size):
+        response = assert_query_budget(
+            endpoint, 'list', lambda: defaultTeamClient.get(f"/api/{endpoint}/?page_size={page_size}")
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data['results']) == page_size
+
+    # One statement validates the filters, then the count and the page
+    @pytest.mark.parametrize("endpoint", ['likes', 'comments'])
+    @pytest.mark.parametrize("action", ['list by post', 'list by user', 'list by post and user'])
+    def test_filtered_list(self, assert_query_budget, defaultTeamClient, authors, endpoint, action):
+        post = Post.objects.filter(authenticated_permission=1).last()
+        user = Like.objects.get(post=post).user
+        params = {
+            'list by post': f"post={post.id}",
+            'list by user': f"user={user.id}",
+            'list by post and user': f"post={post.id}&user={user.id}",
+        }[action]
+        response = assert_query_budget(
+            endpoint, action, lambda: defaultTeamClient.get(f"/api/{endpoint}/?{params}")
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] > 0
+
+    @pytest.mark.parametrize("endpoint, model", [('posts', Post), ('likes', Like), ('comments', Comment)])
+    def test_retrieve(self, assert_query_budget, defaultTeamClient, authors, endpoint, model):
+        obj = model.objects.last()
+        response = assert_query_budget(
+            endpoint, 'retrieve', lambda: defaultTeamClient.get(f"/api/{endpoint}/{obj.id}/")
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize("endpoint, payload", [
+        ('posts', {'title': "Title", 'content': "Content", 'team_permission': 1}),
+        ('likes', {}),
+        ('comments', {'content': "Comment"}),
+    ])
+    def test_create(self, assert_query_budget, defaultTeamClient, authors, endpoint, payload):
+        post = Post.objects.create(author=authors[1], title="Title", content="Content", authenticated_permission=1)
+        if endpoint != 'posts':
+            payload = {**payload, 'post': post.id}
+        response = assert_query_budget(
+            endpoint, 'create', lambda: defaultTeamClient.post(f"/api/{endpoint}/", data=payload)
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_update(self, assert_query_budget, defaultTeamClient, authors):
+        post = Post.objects.create(author=authors[2], title="Title", content="Content", authenticated_permission=2)
+        response = assert_query_budget(
+            'posts', 'update', lambda: defaultTeamClient.patch(f"/api/posts/{post.id}/", data={'content': "Edited"})
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+    @pytest.mark.parametrize("endpoint", ['posts', 'likes', 'comments'])
+    def test_destroy(self, assert_query_budget, defaultTeamClient, defaultTeamUser, authors, endpoint):
+        post = Post.objects.create(author=defaultTeamUser, title="Title", content="Content", authenticated_permission=1)
+        like = Like.objects.create(user=defaultTeamUser, post=post)
+        comment = Comment.objects.create(user=defaultTeamUser, post=post, content="Comment")
+        obj = {'posts': post, 'likes': like, 'comments': comment}[endpoint]
+
+        response = assert_query_budget(
+            endpoint, 'destroy', lambda: defaultTeamClient.delete(f"/api/{endpoint}/{obj.id}/")
+        )
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+# Authors spread over several teams, each with posts that are liked and commented
+@pytest.fixture
+def authors(defaultTeamUser):
+    users = [defaultTeamUser]
+    for name in ["a", "b", "c", "d"]:
+        team, _ = Team.objects.get_or_create(name=f"Team {name}")
+        users.append(User.objects.create_user(
+            email=f"{name}@email.com",
+            username=name,
+            password=name,
+            team=team
+        ))
+
+    for i in range(120):
+        post = Post.objects.create(
+            author=users[i % len(users)],
+            title=f"Title {i}",
+            content="Content",
+            authenticated_permission=1,
+        )
+        user = users[(i + 1) % len(users)]
+        Like.objects.create(user=user, post=post)
+        Comment.objects.create(user=user, post=post, content="Comment")
+    return users
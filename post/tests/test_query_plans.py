@@ -0,0 +1,188 @@
+from datetime import timedelta
+from urllib import parse
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Like, Comment
+from post.audiences import rebuild_post_audiences
+from post.feeds import rebuild_feeds
+from post.pagination import encode_post_cursor
+from post.trending import rebuild_trending
+from rest_framework import status
+
+SEEDED_POSTS = 3000
+
+
+def page_plans(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK, response.content
+    # Page queries, as run by the endpoint; counts and lookups are left out
+    return [
+        explain(query['sql']) for query in queries.captured_queries
+        if ' LIMIT ' in query['sql'] and not query['sql'].startswith('SELECT COUNT(')
+    ]
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}')
+            return '\n'.join(row[0] for row in cursor.fetchall())
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+# The planner, with its regular settings and statistics of the seeded data,
+# serves the endpoint's page queries from each of the given indexes
+def assert_uses_indexes(client, url, *indexes):
+    plans = page_plans(client, url)
+    assert plans
+    plan = '\n\n'.join(plans)
+    for index in indexes:
+        assert index in plan, plan
+
+
+def search_index():
+    return 'post_search_document_idx' if connection.vendor == 'postgresql' else 'post_search VIRTUAL TABLE INDEX'
+
+
+def client_for(user):
+    client = APIClient()
+    if user is not None:
+        client.force_authenticate(user=user)
+    return client
+
+
+def since(hours):
+    return parse.quote((timezone.now() - timedelta(hours=hours)).isoformat())
+
+
+# posted_on of the seeded post at `position`, newest first
+def posted_on_at(position):
+    return parse.quote(Post.objects.order_by('-posted_on', '-id')[position].posted_on.isoformat())
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    def test_anonymous_post_list(self, seeded):
+        assert_uses_indexes(client_for(None), "/api/posts/", 'post_public_posted_on_idx')
+
+    def test_post_list(self, seeded):
+        assert_uses_indexes(client_for(seeded[0]), "/api/posts/", 'post_posted_on_id_idx')
+
+    def test_post_keyset_page(self, seeded):
+        post = Post.objects.order_by('-posted_on', '-id')[SEEDED_POSTS // 2]
+        cursor = encode_post_cursor(post.posted_on, post.pk)
+        assert_uses_indexes(client_for(seeded[0]), f"/api/posts/?cursor={cursor}", 'post_posted_on_id_idx')
+
+    @pytest.mark.parametrize("deep", [False, True])
+    def test_feed(self, seeded, deep):
+        url = "/api/feed/"
+        if deep:
+            post = Post.objects.order_by('-posted_on', '-id')[SEEDED_POSTS // 2]
+            url += f"?cursor={encode_post_cursor(post.posted_on, post.pk)}"
+        assert_uses_indexes(
+            client_for(seeded[0]), url,
+            'feed_entry_user_posted_idx', 'post_authenticated_posted_idx', 'post_public_posted_on_idx',
+        )
+
+    @pytest.mark.parametrize("anonymous", [False, True])
+    def test_trending(self, seeded, anonymous):
+        client = client_for(None if anonymous else seeded[0])
+        assert_uses_indexes(client, "/api/posts/trending/", 'trending_log_score_idx')
+
+    @pytest.mark.parametrize("anonymous", [False, True])
+    def test_search(self, seeded, anonymous):
+        client = client_for(None if anonymous else seeded[0])
+        assert_uses_indexes(client, "/api/posts/search/?q=title%201500", search_index())
+
+    @pytest.mark.parametrize("params, index", [
+        (lambda users: f"author={users[1].id}", 'post_author_posted_idx'),
+        # Members are found by team, then their posts by author
+        (lambda users: f"team={users[0].team_id}", 'user_customuser_team_id'),
+        (lambda users: f"posted_on_after={since(2)}", 'post_posted_on_id_idx'),
+        (lambda users: f"posted_on_after={posted_on_at(2000)}&posted_on_before={posted_on_at(1000)}", 'post_posted_on_id_idx'),
+        (lambda users: "visibility=public", 'post_public_posted_on_idx'),
+        (lambda users: "visibility=authenticated", 'post_authenticated_posted_idx'),
+        (lambda users: "visibility=team", 'post_team_posted_idx'),
+        (lambda users: "visibility=private", 'post_private_posted_idx'),
+    ])
+    def test_filtered_post_list(self, seeded, params, index):
+        # seeded[2] authors the private posts
+        assert_uses_indexes(client_for(seeded[2]), f"/api/posts/?{params(seeded)}", index)
+
+    @pytest.mark.parametrize("url, param, prefix", [
+        ("/api/likes/", 'liked_at', 'like'), ("/api/comments/", 'commented_at', 'comment'),
+    ])
+    @pytest.mark.parametrize("by_post", [False, True])
+    def test_filtered_list_by_date(self, seeded, url, param, prefix, by_post):
+        url += f"?{param}_after={since(30)}"
+        if by_post:
+            url += f"&post={Post.objects.filter(author=seeded[0]).order_by('id').first().id}"
+        index = f'{prefix}_post_{param}_idx' if by_post else f'{prefix}_{param}_idx'
+        assert_uses_indexes(client_for(seeded[0]), url, index)
+
+    @pytest.mark.parametrize("url, index", [
+        ("/api/likes/", 'like_liked_at_idx'), ("/api/comments/", 'comment_commented_at_idx'),
+    ])
+    def test_list(self, seeded, url, index):
+        assert_uses_indexes(client_for(seeded[0]), url, index)
+
+    @pytest.mark.parametrize("url, index", [
+        ("/api/likes/", 'like_post_liked_at_idx'), ("/api/comments/", 'comment_post_commented_at_idx'),
+    ])
+    def test_list_by_post(self, seeded, url, index):
+        post = Post.objects.filter(public_permission=True).last()
+        assert_uses_indexes(client_for(seeded[0]), f"{url}?post={post.id}", index)
+
+    @pytest.mark.parametrize("url, index", [
+        ("/api/likes/", 'like_user_liked_at_idx'), ("/api/comments/", 'comment_user_commented_at_idx'),
+    ])
+    def test_list_by_user(self, seeded, url, index):
+        assert_uses_indexes(client_for(seeded[0]), f"{url}?user={seeded[1].id}", index)
+
+
+# Posts of every visibility spread over several teams, each liked and commented
+@pytest.fixture
+def seeded(db):
+    users = []
+    for name in ["a", "b", "c", "d"]:
+        team, _ = Team.objects.get_or_create(name=f"Team {name}")
+        users.append(User.objects.create_user(
+            email=f"{name}@email.com",
+            username=name,
+            password=name,
+            team=team
+        ))
+
+    now = timezone.now()
+    posts = Post.objects.bulk_create([
+        Post(
+            author=users[i % len(users)],
+            title=f"Title {i}",
+            content="Content",
+            posted_on=now - timedelta(minutes=i),
+            public_permission=i % 4 == 0,
+            authenticated_permission=1 if i % 4 == 1 else 0,
+            team_permission=0 if i % 8 == 2 else 1,
+        )
+        for i in range(SEEDED_POSTS)
+    ])
+    rebuild_post_audiences()
+    rebuild_feeds()
+    Like.objects.bulk_create([
+        Like(post=post, user=users[(i + j) % len(users)]) for i, post in enumerate(posts) for j in range(2)
+    ])
+    Comment.objects.bulk_create([
+        Comment(post=post, user=users[(i + 1) % len(users)], content="Comment") for i, post in enumerate(posts)
+    ])
+    rebuild_trending()
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return users
@@ -469,6 +469,23 @@ class TestReadDetailPost:
         response = defaultTeamClient.get(f"/api/posts/{post_id}/")
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
+    def test_non_numeric_id_not_found(self, defaultTeamClient):
+        response = defaultTeamClient.get("/api/posts/abc/")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_read_uses_a_single_query(self, teamAClient, teamAUser, defaultTeamUser, django_assert_num_queries):
+        readable = Post.objects.create(author=teamAUser, title="A", content="B", team_permission=1)
+        hidden = Post.objects.create(author=defaultTeamUser, title="A", content="B", team_permission=1)
+
+        for post_id, expected in [
+            (readable.id, status.HTTP_200_OK),
+            (hidden.id, status.HTTP_403_FORBIDDEN),
+            (hidden.id + 1, status.HTTP_404_NOT_FOUND),
+        ]:
+            with django_assert_num_queries(1):
+                response = teamAClient.get(f"/api/posts/{post_id}/")
+            assert response.status_code == expected
+
         
 
 
@@ -0,0 +1,102 @@
+import datetime
+import decimal
+import json
+import uuid
+import zoneinfo
+
+import msgpack
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Comment
+from post.renderers import FastJSONRenderer, NDJSONRenderer
+from rest_framework import status
+
+
+SAMPLE = {
+    'text': "Plain, accents é and emoji \U0001F600",
+    'separators': "line\u2028paragraph\u2029end",
+    'utc': datetime.datetime(2025, 6, 10, 20, 27, 23, 975842, tzinfo=datetime.timezone.utc),
+    'offset': datetime.datetime(2025, 6, 10, 22, 27, tzinfo=zoneinfo.ZoneInfo('Europe/Paris')),
+    'naive': datetime.datetime(2025, 6, 10, 20, 27),
+    'date': datetime.date(2025, 6, 10),
+    'decimal': decimal.Decimal('1.50'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'lazy': gettext_lazy("Not found."),
+    'error': ErrorDetail("Invalid page.", code='invalid'),
+    'values': (1, None, True, False, 0.5, -3),
+    'nested': [{'a': []}, {}],
+}
+
+
+class TestFastJSONRenderer:
+    @pytest.mark.parametrize("data", [SAMPLE, {'big': 2 ** 70, 1: "int key"}, [], "text", None])
+    def test_same_bytes_as_json_renderer(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_left_to_json_renderer(self):
+        media_type = 'application/json; indent=4'
+        rendered = FastJSONRenderer().render(SAMPLE, media_type)
+        assert rendered == JSONRenderer().render(SAMPLE, media_type)
+        assert b'\n    "text"' in rendered
+
+    def test_ndjson_line(self):
+        line = NDJSONRenderer().render(SAMPLE)
+        assert line == JSONRenderer().render(SAMPLE) + b'\n'
+
+
+@pytest.mark.django_db
+class TestRendererNegotiation:
+    @pytest.mark.parametrize("path", ["/api/posts/", "/api/comments/", "/api/posts/?fields=id,title"])
+    def test_api_responses_match_json_renderer(self, defaultTeamClient, posts, path):
+        response = defaultTeamClient.get(path)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == "application/json"
+        assert response.content == JSONRenderer().render(response.data)
+
+    def test_message_pack(self, defaultTeamClient, posts):
+        response = defaultTeamClient.get("/api/posts/", HTTP_ACCEPT="application/msgpack")
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == "application/msgpack"
+        expected = json.loads(defaultTeamClient.get("/api/posts/").content)
+        assert msgpack.unpackb(response.content) == expected
+
+    def test_message_pack_detail_etag(self, defaultTeamClient, posts):
+        post = Post.objects.first()
+        for _ in range(2):
+            # Cache miss, then hit
+            json_response = defaultTeamClient.get(f"/api/posts/{post.id}/")
+            response = defaultTeamClient.get(f"/api/posts/{post.id}/", HTTP_ACCEPT="application/msgpack")
+            assert response['ETag'] != json_response['ETag']
+            response = defaultTeamClient.get(
+                f"/api/posts/{post.id}/", HTTP_ACCEPT="application/msgpack", HTTP_IF_NONE_MATCH=json_response['ETag'],
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response['Content-Type'] == "application/msgpack"
+
+
+@pytest.fixture
+def defaultTeamUser(db):
+    team, _ = Team.objects.get_or_create(name="default_team")
+    return User.objects.create_user(
+        email="dftu@email.com",
+        username="dftu",
+        password="dftu",
+    )
+
+@pytest.fixture
+def defaultTeamClient(defaultTeamUser):
+    client = APIClient()
+    client.force_authenticate(user=defaultTeamUser)
+    return client
+
+@pytest.fixture
+def posts(defaultTeamUser):
+    for i in range(3):
+        post = Post.objects.create(
+            author=defaultTeamUser, title=f"Title é {i}", content="Content\u2028with separator", authenticated_permission=1,
+        )
+        Comment.objects.create(user=defaultTeamUser, post=post, content=f"Comment {i}")
@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post
+from rest_framework import status
+
+CONTENT = "Lorem ipsum dolor sit amet. " * 100
+
+
+def create_post(client, **data):
+    response = client.post("/api/posts/", data={"title": "Title", "content": CONTENT, "authenticated_permission": 1, **data})
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.data['id']
+
+
+def page_query(queries):
+    return next(query['sql'] for query in queries.captured_queries if 'LIMIT' in query['sql'])
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    def test_default_fields_unchanged(self, teamAClient):
+        create_post(teamAClient)
+        post = teamAClient.get("/api/posts/").data['results'][0]
+        assert 'content' in post
+        assert 'excerpt' not in post
+
+    def test_list_fields(self, teamAClient):
+        create_post(teamAClient)
+        with CaptureQueriesContext(connection) as queries:
+            response = teamAClient.get("/api/posts/?fields=id,title,like_count")
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data['results'][0]) == ['id', 'title', 'like_count']
+        sql = page_query(queries)
+        assert '"content"' not in sql
+        assert '"excerpt"' not in sql
+        assert 'user_customuser' not in sql
+
+    def test_list_excerpt_mode(self, teamAClient):
+        create_post(teamAClient)
+        with CaptureQueriesContext(connection) as queries:
+            response = teamAClient.get("/api/posts/?mode=excerpt")
+        post = response.data['results'][0]
+        assert 'content' not in post
+        assert post['excerpt'] == CONTENT[:200]
+        assert post['username'] == "tau"
+        assert '"content"' not in page_query(queries)
+
+    def test_excerpt_mode_with_cursor_pagination(self, teamAClient):
+        for _ in range(3):
+            create_post(teamAClient)
+        response = teamAClient.get("/api/posts/?cursor=&page_size=2&mode=excerpt")
+        assert response.status_code == status.HTTP_200_OK
+        response = teamAClient.get(response.data['next page'])
+        assert len(response.data['results']) == 1
+        assert 'excerpt' in response.data['results'][0]
+
+    def test_retrieve_fields(self, teamAClient):
+        post_id = create_post(teamAClient)
+        full = teamAClient.get(f"/api/posts/{post_id}/")
+        response = teamAClient.get(f"/api/posts/{post_id}/?fields=title,excerpt")
+        assert response.data == {'title': "Title", 'excerpt': CONTENT[:200]}
+        # Another representation, another ETag
+        assert response['ETag'] != full['ETag']
+        response = teamAClient.get(f"/api/posts/{post_id}/?fields=title,excerpt", HTTP_IF_NONE_MATCH=full['ETag'])
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_title_edit_keeps_excerpt(self, teamAClient):
+        post_id = create_post(teamAClient)
+        response = teamAClient.patch(f"/api/posts/{post_id}/", data={"title": "Edited"})
+        assert response.status_code == status.HTTP_200_OK
+        response = teamAClient.get(f"/api/posts/{post_id}/?fields=title,excerpt")
+        assert response.data == {'title': "Edited", 'excerpt': CONTENT[:200]}
+
+        response = teamAClient.get("/api/posts/search/?q=lorem&fields=id")
+        assert response.data['results'][0]['snippet'].startswith("<mark>Lorem</mark> ipsum")
+
+        teamAClient.patch(f"/api/posts/{post_id}/", data={"content": "New content"})
+        assert teamAClient.get(f"/api/posts/{post_id}/?fields=excerpt").data == {'excerpt': "New content"}
+
+    def test_anonymous_pages_cached_per_fields(self, teamAClient):
+        create_post(teamAClient, public_permission=True)
+        client = APIClient()
+        client.get("/api/posts/")
+        response = client.get("/api/posts/?mode=excerpt")
+        assert response['X-Cache'] == "MISS"
+        assert 'excerpt' in response.json()['results'][0]
+
+    def test_invalid_fields(self, teamAClient):
+        post_id = create_post(teamAClient)
+        response = teamAClient.get("/api/posts/?fields=id,password")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['detail'] == "Unknown fields: password."
+        assert teamAClient.get("/api/posts/?fields=").status_code == status.HTTP_400_BAD_REQUEST
+        assert teamAClient.get(f"/api/posts/{post_id}/?mode=short").status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    client = APIClient()
+    client.force_authenticate(user=teamAUser)
+    return client
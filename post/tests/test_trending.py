@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from post.models import Post, Like, Comment, TrendingScore
+from post.trending import LIKE_WEIGHT, add_activity, decayed_score, remove_activity
+from rest_framework import status
+
+
+def trending_titles(client, params=""):
+    response = client.get(f"/api/posts/trending/{params}")
+    assert response.status_code == status.HTTP_200_OK
+    return [post['title'] for post in response.data['results']]
+
+
+def scores():
+    return {score.post.title: decayed_score(score.log_score) for score in TrendingScore.objects.select_related('post')}
+
+
+@pytest.mark.django_db
+class TestTrending:
+    def test_ranked_by_likes_and_comments(self, teamAClient, teamBUser, posts):
+        response = teamAClient.post("/api/likes/", data={"post": posts["Liked"].id})
+        assert response.status_code == status.HTTP_201_CREATED
+        Like.objects.create(user=teamBUser, post=posts["Liked"])
+        Like.objects.create(user=teamBUser, post=posts["Public"])
+        Comment.objects.create(user=teamBUser, post=posts["Commented"], content="Comment")
+        teamAClient.post("/api/comments/", data={"post": posts["Commented"].id, "content": "Comment"})
+
+        assert trending_titles(teamAClient) == ["Commented", "Liked", "Public"]
+        assert scores()["Commented"] == pytest.approx(4, rel=1e-3)
+        assert scores()["Liked"] == pytest.approx(2, rel=1e-3)
+
+    def test_activity_decays(self, teamAClient, posts):
+        now = timezone.now()
+        # Four likes two days ago are worth 4 / 2^4 of a like now
+        add_activity([(posts["Liked"].id, now - timedelta(days=2))] * 4, LIKE_WEIGHT)
+        add_activity([(posts["Public"].id, now)], LIKE_WEIGHT)
+
+        assert trending_titles(teamAClient) == ["Public", "Liked"]
+        assert scores()["Liked"] == pytest.approx(0.25, rel=1e-3)
+
+    def test_unlike_and_delete_remove_activity(self, teamAClient, teamAUser, teamBUser, posts):
+        response = teamAClient.post("/api/likes/", data={"post": posts["Liked"].id})
+        comment = Comment.objects.create(user=teamBUser, post=posts["Commented"], content="Comment")
+        Like.objects.create(user=teamBUser, post=posts["Commented"])
+        assert trending_titles(teamAClient) == ["Commented", "Liked"]
+
+        teamAClient.delete(f"/api/likes/{response.data['id']}/")
+        comment.delete()
+        assert trending_titles(teamAClient) == ["Commented"]
+        assert scores()["Commented"] == pytest.approx(1, rel=1e-3)
+
+    def test_bulk_likes(self, teamAClient, posts):
+        teamAClient.post("/api/likes/bulk/", data={"like": [posts["Liked"].id, posts["Public"].id]}, format='json')
+        assert sorted(trending_titles(teamAClient)) == ["Liked", "Public"]
+
+        teamAClient.post("/api/likes/bulk/", data={"unlike": [posts["Liked"].id]}, format='json')
+        assert trending_titles(teamAClient) == ["Public"]
+
+    def test_access_filtered(self, teamAClient, teamBUser, posts):
+        for post in posts.values():
+            Like.objects.create(user=teamBUser, post=post)
+
+        assert "Team B" not in trending_titles(teamAClient)
+        assert "Team B" in trending_titles(client_for(teamBUser))
+        assert trending_titles(APIClient()) == ["Public"]
+
+    def test_limit_and_fields(self, teamAClient, teamBUser, posts):
+        for post in posts.values():
+            Like.objects.create(user=teamBUser, post=post)
+
+        response = teamAClient.get("/api/posts/trending/?limit=2&fields=id,title")
+        assert len(response.data['results']) == 2
+        assert list(response.data['results'][0]) == ['id', 'title']
+
+        for limit in ("0", "-1", "x"):
+            response = teamAClient.get(f"/api/posts/trending/?limit={limit}")
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_single_query(self, django_assert_num_queries, teamAClient, teamBUser, posts):
+        for post in posts.values():
+            Like.objects.create(user=teamBUser, post=post)
+        with django_assert_num_queries(1):
+            teamAClient.get("/api/posts/trending/")
+
+    def test_compaction(self, teamAClient, teamBUser, posts):
+        now = timezone.now()
+        add_activity([(posts["Liked"].id, now - timedelta(days=10))], LIKE_WEIGHT)
+        Like.objects.create(user=teamBUser, post=posts["Public"])
+        like = Like.objects.create(user=teamBUser, post=posts["Commented"])
+        Comment.objects.create(user=teamBUser, post=posts["Commented"], content="Comment")
+        like.delete()
+
+        assert trending_titles(teamAClient) == ["Commented", "Public"]
+        call_command('compact_trending')
+        assert set(scores()) == {"Commented", "Public"}
+
+        incremental = scores()
+        call_command('compact_trending', '--rebuild')
+        assert scores() == pytest.approx(incremental, rel=1e-6)
+
+    def test_rebuild_ignores_removed_and_old_activity(self, teamBUser, posts):
+        like = Like.objects.create(user=teamBUser, post=posts["Liked"])
+        Like.objects.filter(pk=like.pk).update(liked_at=timezone.now() - timedelta(days=30))
+        remove_activity([(posts["Liked"].id, like.liked_at)], LIKE_WEIGHT)
+        Comment.objects.bulk_create([Comment(user=teamBUser, post=posts["Commented"], content="Comment")])
+
+        call_command('compact_trending', '--rebuild')
+        assert list(scores()) == ["Commented"]
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def teamAClient(teamAUser):
+    return client_for(teamAUser)
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
+
+@pytest.fixture
+def posts(teamAUser, teamBUser):
+    return {
+        title: Post.objects.create(author=author, title=title, content="Content", **permissions)
+        for title, author, permissions in [
+            ("Liked", teamAUser, {'authenticated_permission': 1}),
+            ("Commented", teamBUser, {'authenticated_permission': 1}),
+            ("Public", teamBUser, {'public_permission': True, 'authenticated_permission': 1}),
+            ("Team B", teamBUser, {'team_permission': 1}),
+        ]
+    }
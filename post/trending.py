@@ -0,0 +1,119 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import connections, router
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Exp, Greatest, Ln
+from django.utils import timezone
+from .models import Comment, Like, TrendingScore
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+# Activity counts half as much every TRENDING_HALF_LIFE
+TRENDING_HALF_LIFE = timedelta(hours=12)
+# Posts whose decayed score fell under this are dropped by compaction
+TRENDING_MIN_SCORE = 0.01
+# Older activity is ignored by rebuilds, it has decayed by 2^-28
+TRENDING_HORIZON = timedelta(days=14)
+
+# Scores are stored as ln(sum of weight * 2^((t - TRENDING_EPOCH) / half-life)).
+# Every score decays at the same rate, so the stored values rank posts as their
+# decayed scores would at any time and are never rewritten as time passes; the
+# logarithm keeps them small however far from the epoch.
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+DECAY_RATE = math.log(2) / TRENDING_HALF_LIFE.total_seconds()
+
+
+def log_weight(weight, at):
+    return math.log(weight) + DECAY_RATE * (at - TRENDING_EPOCH).total_seconds()
+
+
+# Lowest stored value of a post still trending at `now`
+def trending_cutoff(now=None):
+    return log_weight(TRENDING_MIN_SCORE, now or timezone.now())
+
+
+# Decayed score at `now` of a stored value
+def decayed_score(log_score, now=None):
+    return math.exp(log_score - log_weight(1.0, now or timezone.now()))
+
+
+def _log_sum(values):
+    top = max(values)
+    return top + math.log(sum(math.exp(value - top) for value in values))
+
+
+# Exponents of `weight` at each (post id, time) event, combined per post
+def _exponents(events, weight):
+    exponents = defaultdict(list)
+    for post_id, at in events:
+        exponents[post_id].append(log_weight(weight, at))
+    return {post_id: _log_sum(values) for post_id, values in exponents.items()}
+
+
+# Activity of `weight` on each (post id, time) event, added in a single upsert
+# as ln(e^score + e^x) = max(score, x) + ln(1 + e^-|score - x|)
+def add_activity(events, weight):
+    exponents = _exponents(events, weight)
+    if not exponents:
+        return
+    db = router.db_for_write(TrendingScore)
+    connection = connections[db]
+    qn = connection.ops.quote_name
+    table = qn(TrendingScore._meta.db_table)
+    greatest = 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+    score, x = f"{table}.{qn('log_score')}", f"excluded.{qn('log_score')}"
+
+    values = ', '.join(['(%s, %s)'] * len(exponents))
+    sql = (
+        f"INSERT INTO {table} ({qn('post_id')}, {qn('log_score')}) VALUES {values} "
+        f"ON CONFLICT ({qn('post_id')}) DO UPDATE SET {qn('log_score')} = "
+        f"{greatest}({score}, {x}) + LN(1 + EXP(-ABS({score} - {x})))"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [param for item in sorted(exponents.items()) for param in item])
+
+
+# Activity removed, as ln(e^score - e^x) = score + ln(1 - e^(x - score)). What is
+# left of a post whose activity is all gone is rounding, floored far below
+# TRENDING_MIN_SCORE until compaction drops it.
+def remove_activity(events, weight):
+    exponents = _exponents(events, weight)
+    if not exponents:
+        return
+    x = Case(
+        *(When(post_id=post_id, then=Value(value)) for post_id, value in exponents.items()), output_field=FloatField(),
+    )
+    TrendingScore.objects.filter(post_id__in=exponents).update(
+        log_score=F('log_score') + Ln(Greatest(1 - Exp(x - F('log_score')), Value(1e-12)))
+    )
+
+
+# Drop posts that stopped trending. Returns how many were dropped.
+def compact_trending(now=None):
+    deleted, _ = TrendingScore.objects.filter(log_score__lt=trending_cutoff(now)).delete()
+    return deleted
+
+
+# Recompute every score from the likes and comments of the last TRENDING_HORIZON,
+# e.g. after bulk writes that bypassed signals. Returns the number of scores.
+def rebuild_trending(now=None):
+    now = now or timezone.now()
+    since = now - TRENDING_HORIZON
+    exponents = defaultdict(list)
+    for post_id, at in Like.objects.filter(liked_at__gte=since).values_list('post_id', 'liked_at').iterator():
+        exponents[post_id].append(log_weight(LIKE_WEIGHT, at))
+    for post_id, at in Comment.objects.filter(commented_at__gte=since).values_list('post_id', 'commented_at').iterator():
+        exponents[post_id].append(log_weight(COMMENT_WEIGHT, at))
+
+    cutoff = trending_cutoff(now)
+    log_scores = {post_id: _log_sum(values) for post_id, values in exponents.items()}
+    scores = [
+        TrendingScore(post_id=post_id, log_score=log_score)
+        for post_id, log_score in log_scores.items() if log_score >= cutoff
+    ]
+
+    TrendingScore.objects.all().delete()
+    TrendingScore.objects.bulk_create(scores, batch_size=1000)
+    return len(scores)
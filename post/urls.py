@@ -1,10 +1,11 @@
-from .viewsets import PostViewSet, LikeViewSet, CommentViewSet
+from .viewsets import PostViewSet, LikeViewSet, CommentViewSet, FeedViewSet
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
 router.register(r'posts', PostViewSet)
 router.register(r'likes', LikeViewSet)
 router.register(r'comments', CommentViewSet)
+router.register(r'feed', FeedViewSet, basename='feed')
 
 urlpatterns = [
     
@@ -1,34 +1,243 @@
-from rest_framework.viewsets import ModelViewSet
-from .serializers import PostSerializer, LikeSerializer, CommentSerializer
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import GenericViewSet, ModelViewSet
+from django_filters.rest_framework import DjangoFilterBackend
+from .serializers import PostSerializer, LikeSerializer, LikeToggleSerializer, CommentSerializer
 from .models import Post, Like, Comment
 from .permissions import PostPermissions, LikeAndCommentPermissions
-from .filters import PostAccessFilter, get_queryset_aux
-from rest_framework.exceptions import NotFound, PermissionDenied
+from .filters import CommentFilter, LikeFilter, PostAccessFilter, PostFilter, get_queryset_aux
+from .counters import adjust_post_counts
+from .caching import (
+    bump_versions, claim_public_list_rebuild, get_post_detail, get_public_list, post_detail_key,
+    public_list_generations, public_list_key, release_public_list_rebuild, set_post_detail, set_public_list,
+)
+from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
+from rest_framework.pagination import _positive_int
+from user.models import CustomUser
+from .conditional import (
+    ConditionalListMixin, PostScopedListMixin, fields_etag, not_modified, post_etag, post_last_modified, set_validators,
+)
 
-from .pagination import LikePagination, PostCommentsPagination
+from .audiences import batches
+from .feeds import feed_positions
+from .trending import LIKE_WEIGHT, add_activity, remove_activity, trending_cutoff
+from .pagination import FeedPagination, LikePagination, PostCommentsPagination, PostPagination
+from .readers import compiled_reader
+from .search import render_snippet, search_posts, search_terms
+from .renderers import FastJSONRenderer, NDJSONRenderer, accepts_gzip, ndjson_stream
 from rest_framework.exceptions import PermissionDenied
 
+# Rows fetched per round trip by exports
+EXPORT_CHUNK_SIZE = 2000
+TRENDING_LIMIT = 10
+MAX_TRENDING_LIMIT = 100
 
-class PostViewSet(ModelViewSet):   
+# Model columns behind serializer fields, where the names differ
+POST_FIELD_COLUMNS = {'username': 'author__username'}
+
+
+def pick_fields(data, fields):
+    return {name: value for name, value in data.items() if name in fields}
+
+
+class PostViewSet(ConditionalListMixin, ModelViewSet):   
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [PostPermissions]
-    pagination_class = PostCommentsPagination
+    pagination_class = PostPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PostFilter
+    reader_columns = ('id', 'posted_on', 'updated_at', 'activity_at')
     
     def get_queryset(self):
-        accessible_posts = PostAccessFilter.get_accessible_posts_for(user=self.request.user).order_by('-posted_on')
-        post_id = self.kwargs.get('pk')
-        if post_id is not None:
-            try:
-                # Check if the post is accessible directly
-                post = accessible_posts.get(id=post_id)
-            except Post.DoesNotExist:
-                # If not found in accessible, raise NotFound or PermissionDenied
-                if Post.objects.filter(id=post_id).exists():
-                    raise PermissionDenied("Post not accessible.")
-                else:
-                    raise NotFound("Post not found.")
-        return accessible_posts
+        queryset = (
+            PostAccessFilter.get_accessible_posts_for(user=self.request.user)
+            .select_related('author')
+            .order_by('-posted_on')
+        )
+        if self.action in ('list', 'export', 'trending', 'search'):
+            # Only the columns of the requested fields are read, plus those
+            # needed for pagination and Last-Modified
+            fields = self.get_post_fields()
+            columns = set(self.reader_columns)
+            columns.update(POST_FIELD_COLUMNS.get(name, name) for name in fields)
+            if 'username' not in fields:
+                queryset = queryset.select_related(None)
+            queryset = queryset.only(*columns)
+        return queryset
+
+    # ?fields=id,title,... picks fields, ?mode=excerpt swaps the content for its excerpt
+    def get_post_fields(self):
+        params = self.request.query_params
+        mode = params.get('mode', 'full')
+        if mode not in ('full', 'excerpt'):
+            raise ParseError("Invalid mode.")
+        if 'fields' not in params:
+            return PostSerializer.EXCERPT_FIELDS if mode == 'excerpt' else PostSerializer.DEFAULT_FIELDS
+
+        fields = [name.strip() for name in params['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in PostSerializer.Meta.fields]
+        if unknown:
+            raise ParseError(f"Unknown fields: {', '.join(unknown)}.")
+        if not fields:
+            raise ParseError("No fields requested.")
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ('list', 'retrieve', 'export', 'trending', 'search'):
+            kwargs.setdefault('fields', self.get_post_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    # Anonymous pages are the same for everyone, they are served as cached bytes
+    def list(self, request, *args, **kwargs):
+        key = public_list_key(request)
+        if key is None:
+            return super().list(request, *args, **kwargs)
+
+        entry, state = get_public_list(key)
+        if state == 'fresh' or (state == 'stale' and not claim_public_list_rebuild(key)):
+            response = not_modified(request, etag=entry['etag'])
+            if response is None:
+                response = set_validators(HttpResponse(entry['body'], content_type=entry['content_type']), entry['etag'])
+            response['X-Cache'] = 'HIT' if state == 'fresh' else 'STALE'
+            return response
+
+        # Generations are read first, so a change made while building retires the page
+        generations = public_list_generations()
+        try:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code == 200:
+                response = self.finalize_response(request, response, *args, **kwargs)
+                response.render()
+                set_public_list(key, generations, response)
+        finally:
+            if state == 'stale':
+                release_public_list_rebuild(key)
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def get_last_modified(self, obj):
+        return post_last_modified(obj)
+
+    # Every accessible post as newline-delimited JSON, streamed from a server-side
+    # cursor so memory stays constant whatever the number of posts
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, FastJSONRenderer])
+    def export(self, request):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('-posted_on', '-id')
+        reader = self.get_reader()
+        if reader is not None:
+            rows = reader.read(reader.queryset(queryset).iterator(chunk_size=EXPORT_CHUNK_SIZE))
+        else:
+            rows = (
+                row
+                for chunk in batches(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE))
+                for row in self.get_serializer(chunk, many=True).data
+            )
+
+        gzipped = accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        response = StreamingHttpResponse(ndjson_stream(rows, gzipped), content_type=NDJSONRenderer.media_type)
+        response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    # Posts with the most recent likes and comments, ?limit= of them, read from
+    # the top of the trending index
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        try:
+            limit = _positive_int(request.query_params.get('limit', TRENDING_LIMIT), strict=True, cutoff=MAX_TRENDING_LIMIT)
+        except ValueError:
+            raise ParseError("Invalid limit.")
+        queryset = self.get_queryset().filter(trending__log_score__gte=trending_cutoff()).order_by('-trending__log_score')
+        reader = self.get_reader()
+        if reader is None:
+            return Response({'results': self.get_serializer(queryset[:limit], many=True).data})
+        return Response({'results': reader.read_many(reader.queryset(queryset)[:limit])})
+
+    # Accessible posts whose title and content contain every word of ?q=, best
+    # matches first, each with its excerpt highlighted. Access is checked in the
+    # same query as the match.
+    @action(detail=False, methods=['get'], pagination_class=PostCommentsPagination)
+    def search(self, request):
+        terms = search_terms(request.query_params.get('q', ''))
+        if not terms:
+            raise ParseError("Missing search query.")
+        queryset = search_posts(self.get_queryset(), terms).order_by('-search_rank', '-posted_on', '-id')
+        reader = compiled_reader(self.get_serializer(), self.reader_columns + ('snippet',))
+        if reader is None:
+            page = self.paginate_queryset(queryset)
+            snippets = [post.snippet for post in page]
+            data = self.get_serializer(page, many=True).data
+        else:
+            page = self.paginate_queryset(reader.queryset(queryset))
+            position = reader.columns.index('snippet')
+            snippets = [row[position] for row in page]
+            data = reader.read(page)
+        results = [dict(row, snippet=render_snippet(snippet)) for row, snippet in zip(data, snippets)]
+        return self.get_paginated_response(results)
+
+    def get_object(self):
+        # A single query loads the post, its author and whether the user can read it
+        posts = PostAccessFilter.annotate_accessible(Post.objects.select_related('author'), self.request.user)
+        try:
+            post = posts.filter(pk=self.kwargs['pk']).first()
+        except (TypeError, ValueError):
+            post = None
+
+        # Not found at all, or found but not accessible
+        if post is None:
+            raise NotFound("Post not found.")
+        if not post.is_accessible:
+            raise PermissionDenied("Post not accessible.")
+
+        self.check_object_permissions(self.request, post)
+        return post
+
+    # Post detail is served from the cache, but access is still decided per caller.
+    # Entries hold every field, each response keeps the requested ones.
+    def retrieve(self, request, *args, **kwargs):
+        if not str(self.kwargs['pk']).isdigit():
+            raise NotFound("Post not found.")
+        pk = int(self.kwargs['pk'])
+        fields = self.get_post_fields()
+        format = request.accepted_renderer.format
+
+        key = post_detail_key(pk)
+        entry = get_post_detail(key)
+        if entry is None:
+            post = self.get_object()
+            # Validators come from the row, the body is only built when needed
+            etag, last_modified = post_etag(post), post_last_modified(post)
+            response = not_modified(request, etag=fields_etag(etag, fields, format), last_modified=last_modified)
+            if response is not None:
+                return response
+            data = self.get_serializer(post, fields=PostSerializer.Meta.fields).data
+            set_post_detail(key, post, data, etag, last_modified)
+            return set_validators(Response(pick_fields(data, fields)), fields_etag(etag, fields, format), last_modified)
+
+        access = entry['access']
+        post = Post(
+            id=pk,
+            author=CustomUser(id=access['author_id'], team_id=access['author_team_id']),
+            public_permission=access['public_permission'],
+            authenticated_permission=access['authenticated_permission'],
+            team_permission=access['team_permission'],
+        )
+        if not PostAccessFilter.is_accessible(post, request.user):
+            raise PermissionDenied("Post not accessible.")
+        self.check_object_permissions(request, post)
+        etag = fields_etag(entry['etag'], fields, format)
+        response = not_modified(request, etag=etag, last_modified=entry['last_modified'])
+        if response is not None:
+            return response
+        return set_validators(Response(pick_fields(entry['data'], fields)), etag, entry['last_modified'])
 
     def perform_create(self, serializer):
         content = serializer.validated_data.get("content")
@@ -36,20 +245,29 @@ class PostViewSet(ModelViewSet):
         serializer.save(author=self.request.user, excerpt=excerpt)
 
     def perform_update(self, serializer):
-        content = serializer.validated_data.get("content")
+        # The excerpt follows the content, partial updates without it keep it
+        if 'content' not in serializer.validated_data:
+            return serializer.save()
+        content = serializer.validated_data["content"]
         excerpt = content[:200] if content else ""
         serializer.save(excerpt=excerpt)
 
 
-class LikeViewSet(ModelViewSet):
+class LikeViewSet(PostScopedListMixin, ModelViewSet):
     queryset = Like.objects.all()
     serializer_class = LikeSerializer
     http_method_names = ['get', 'head', 'post', 'delete']
     permission_classes = [LikeAndCommentPermissions]
     pagination_class = LikePagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = LikeFilter
+    reader_columns = ('liked_at',)
 
     def get_queryset(self):
-        return get_queryset_aux(self.request, Like)
+        return get_queryset_aux(self.request, Like).order_by('-liked_at', '-id')
+
+    def get_last_modified(self, obj):
+        return int(obj.liked_at.timestamp())
     
 
     def perform_create(self, serializer):
@@ -60,18 +278,73 @@ class LikeViewSet(ModelViewSet):
         if not permission.has_read_access(user, post):
             raise PermissionDenied("You do not have permission to like this post.")
         
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+            adjust_post_counts([post.pk], likes=1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            adjust_post_counts([instance.post_id], likes=-1)
+
+    # Apply a batch of likes and unlikes, e.g. synced from an offline client
+    @action(detail=False, methods=['post'], serializer_class=LikeToggleSerializer)
+    def bulk(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        like_ids = serializer.validated_data['like']
+        unlike_ids = serializer.validated_data['unlike']
+        user = request.user
+
+        # One query tells which posts exist and which ones the user can read
+        access = dict(
+            PostAccessFilter.annotate_accessible(Post.objects.filter(id__in=like_ids + unlike_ids), user)
+            .values_list('id', 'is_accessible')
+        )
 
+        now = timezone.now()
+        with transaction.atomic():
+            liked = Like.objects.create_many_once(user, [post_id for post_id in like_ids if access.get(post_id)], now)
+            unliked = Like.objects.delete_many(user, [post_id for post_id in unlike_ids if access.get(post_id)])
+            adjust_post_counts(list(liked), likes=1)
+            adjust_post_counts(list(unliked), likes=-1)
+            add_activity([(post_id, now) for post_id in liked], LIKE_WEIGHT)
+            remove_activity(unliked.items(), LIKE_WEIGHT)
+        if liked or unliked:
+            bump_versions(Like)
 
-class CommentViewSet(ModelViewSet):
+        def outcome(post_id, done, done_status, skipped_status):
+            if post_id not in access:
+                return "not found"
+            if not access[post_id]:
+                return "forbidden"
+            return done_status if post_id in done else skipped_status
+
+        results = [
+            {'post': post_id, 'action': 'like', 'status': outcome(post_id, liked, "liked", "already liked")}
+            for post_id in like_ids
+        ] + [
+            {'post': post_id, 'action': 'unlike', 'status': outcome(post_id, unliked, "unliked", "not liked")}
+            for post_id in unlike_ids
+        ]
+        return Response({'results': results})
+
+
+class CommentViewSet(PostScopedListMixin, ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     http_method_names = ['get', 'head', 'post', 'delete']
     permission_classes = [LikeAndCommentPermissions]
     pagination_class = PostCommentsPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CommentFilter
+    reader_columns = ('commented_at',)
     
     def get_queryset(self):
-        return get_queryset_aux(self.request, Comment)
+        return get_queryset_aux(self.request, Comment).order_by('-commented_at', '-id')
+
+    def get_last_modified(self, obj):
+        return int(obj.commented_at.timestamp())
 
     def perform_create(self, serializer):
         post = serializer.validated_data['post']
@@ -80,7 +353,35 @@ class CommentViewSet(ModelViewSet):
         permission = PostPermissions()
         if not permission.has_read_access(user, post):
             raise PermissionDenied("You do not have permission to comment this post.")
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+            adjust_post_counts([post.pk], comments=1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            adjust_post_counts([instance.post_id], comments=-1)
+
+
+# Home feed: the posts shared with the user or their team, merged with the
+# posts open to every authenticated user, newest first
+class FeedViewSet(GenericViewSet):
+    queryset = Post.objects.all()
+    serializer_class = PostSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = FeedPagination
 
+    def list(self, request, *args, **kwargs):
+        user = request.user
+        positions = self.paginator.paginate_feed(lambda size, position: feed_positions(user, size, position), request)
+        ids = [pk for _, pk in positions]
 
-    
\ No newline at end of file
+        # Entries are checked against the visibility index, in case access changed since
+        posts = PostAccessFilter.get_accessible_posts_for(user).filter(id__in=ids).select_related('author')
+        reader = compiled_reader(self.get_serializer(), ('id',))
+        if reader is not None:
+            posts = reader.queryset(posts)
+        rows = {row.id: row for row in posts}
+        rows = [rows[pk] for pk in ids if pk in rows]
+        data = reader.read_many(rows) if reader is not None else self.get_serializer(rows, many=True).data
+        return self.paginator.get_paginated_response(data)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import CustomUser, Team
+from .models import AuthToken, CustomUser, Team
 
 admin.site.register(Team)
 admin.site.register(CustomUser)
+admin.site.register(AuthToken)
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+from .models import AuthToken, digest_token
+from .principals import get_principal
+
+# Tokens resolve to a user id, cached until the token is revoked
+TOKEN_CACHE_TIMEOUT = 60 * 60
+
+
+def _token_cache_key(digest):
+    return f'auth_token:{digest}'
+
+
+def forget_tokens(digests):
+    keys = [_token_cache_key(digest) for digest in digests]
+    cache.delete_many(keys)
+    # Again once the change is visible, in case a request cached the old state in between
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# Authorization: Bearer <key>
+class BearerTokenAuthentication(BaseAuthentication):
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid token header.")
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed("Invalid token header.")
+        return self.authenticate_credentials(key)
+
+    def authenticate_credentials(self, key):
+        digest = digest_token(key)
+        cache_key = _token_cache_key(digest)
+        user_id = cache.get(cache_key)
+        if user_id is None:
+            user_id = AuthToken.objects.filter(digest=digest).values_list('user_id', flat=True).first()
+            if user_id is None:
+                raise AuthenticationFailed("Invalid token.")
+            cache.set(cache_key, user_id, TOKEN_CACHE_TIMEOUT)
+
+        # The user itself comes from the principal cache, which follows its changes
+        user = get_principal(user_id)
+        if user is None or not user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+        return (user, None)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,9 @@
+from django.contrib.auth.backends import ModelBackend
+from .principals import get_principal
+
+
+# Session requests resolve their user from the principal cache instead of the users table
+class CachedPrincipalBackend(ModelBackend):
+    def get_user(self, user_id):
+        user = get_principal(user_id)
+        return user if self.user_can_authenticate(user) else None
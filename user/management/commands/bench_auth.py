@@ -0,0 +1,49 @@
+import base64
+import secrets
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIClient
+from user.models import AuthToken, CustomUser
+
+
+class Command(BaseCommand):
+    help = "Compare API requests per second under Basic and Bearer token authentication."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--path', default='/api/posts/?page_size=1')
+
+    def handle(self, *args, **options):
+        # The benchmark writes to the configured database, so it never runs in production
+        if not settings.DEBUG:
+            raise CommandError("Benchmarks write test data and only run with DEBUG on.")
+
+        # A throwaway user with a random password, deleted with its token at the end
+        name = f'bench-{secrets.token_hex(4)}'
+        password = secrets.token_urlsafe(16)
+        user = CustomUser.objects.create_user(email=f'{name}@email.com', username=name, password=password)
+        try:
+            token = AuthToken.objects.issue(user, name='bench_auth')
+            basic = base64.b64encode(f'{user.email}:{password}'.encode()).decode()
+            schemes = [('basic', f'Basic {basic}'), ('bearer', f'Bearer {token.key}')]
+
+            self.stdout.write(f"{options['requests']} requests to {options['path']}")
+            self.stdout.write(f"{'scheme':>8} {'req/s':>10} {'ms/req':>10}")
+            for name, header in schemes:
+                client = APIClient(HTTP_HOST='localhost')
+                client.credentials(HTTP_AUTHORIZATION=header)
+                # Warm up caches and connections
+                assert client.get(options['path']).status_code == 200
+
+                start = time.perf_counter()
+                for _ in range(options['requests']):
+                    response = client.get(options['path'])
+                    assert response.status_code == 200, response.status_code
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{name:>8} {options['requests'] / elapsed:>10.1f} {elapsed * 1000 / options['requests']:>10.2f}"
+                )
+        finally:
+            user.delete()
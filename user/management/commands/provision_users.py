@@ -0,0 +1,52 @@
+import csv
+import os
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from user.provisioning import Provisioner, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users in bulk from a CSV or JSONL file with email, username, password, "
+        "and optional team (name) and role columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Default: from the file extension.")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Users inserted per transaction.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Processes hashing passwords.")
+        parser.add_argument('--rejects', help="Write rejected rows (line, email, reason) to this CSV file.")
+
+    def handle(self, *args, **options):
+        rows = read_rows(options['path'], options['format'])
+        provisioner = Provisioner(workers=options['workers'])
+        start = time.perf_counter()
+        processed = 0
+        try:
+            while chunk := list(islice(rows, options['chunk_size'])):
+                provisioner.provision(chunk)
+                processed += len(chunk)
+                rate = processed / (time.perf_counter() - start)
+                self.stdout.write(
+                    f"{processed} rows: {provisioner.created} created, "
+                    f"{len(provisioner.rejects)} rejected ({rate:.0f} rows/s)"
+                )
+        finally:
+            provisioner.close()
+
+        if options['rejects']:
+            with open(options['rejects'], 'w', newline='', encoding='utf-8') as file:
+                writer = csv.DictWriter(file, fieldnames=['line', 'email', 'reason'])
+                writer.writeheader()
+                writer.writerows(provisioner.rejects)
+        for reject in provisioner.rejects[:10]:
+            self.stdout.write(self.style.WARNING(f"Line {reject['line']} ({reject['email']}): {reject['reason']}"))
+        if len(provisioner.rejects) > 10:
+            self.stdout.write(self.style.WARNING(f"... and {len(provisioner.rejects) - 10} more rejects."))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {provisioner.created} users, rejected {len(provisioner.rejects)} rows."
+        ))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:33
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+# Merge teams sharing a name into the oldest one, before the name becomes unique.
+# Members move over, and so do the team audiences of their posts.
+def dedupe_team_names(apps, schema_editor):
+    Team = apps.get_model('user', 'Team')
+    CustomUser = apps.get_model('user', 'CustomUser')
+    PostAudience = apps.get_model('post', 'PostAudience')
+
+    duplicates = Team.objects.values('name').annotate(teams=Count('id'), keep=Min('id')).filter(teams__gt=1)
+    for duplicate in duplicates:
+        keep = duplicate['keep']
+        merged = list(Team.objects.filter(name=duplicate['name']).exclude(id=keep).values_list('id', flat=True))
+        CustomUser.objects.filter(team_id__in=merged).update(team_id=keep)
+        PostAudience.objects.filter(key__in=[f'team:{team_id}' for team_id in merged]).update(key=f'team:{keep}')
+        Team.objects.filter(id__in=merged).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_authtoken'),
+        ('post', '0003_postaudience'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_team_names, migrations.RunPython.noop),
+    ]
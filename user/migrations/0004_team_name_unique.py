@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0003_dedupe_team_names'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='team',
+            name='name',
+            field=models.CharField(max_length=250, unique=True),
+        ),
+    ]
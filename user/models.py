@@ -2,9 +2,26 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, Permis
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.hashers import identify_hasher
+from django.core.cache import cache
+import hashlib
+import secrets
+
+DEFAULT_TEAM_NAME = "default_team"
+DEFAULT_TEAM_CACHE_KEY = 'default_team'
+
+class TeamManager(models.Manager):
+    # Users without a team join the default team, resolved once and then cached
+    def get_default(self):
+        team = cache.get(DEFAULT_TEAM_CACHE_KEY)
+        if team is None:
+            team = self.get_or_create(name=DEFAULT_TEAM_NAME)[0]
+            cache.set(DEFAULT_TEAM_CACHE_KEY, team, None)
+        return team
 
 class Team(models.Model):
-    name = models.CharField(max_length=250)
+    name = models.CharField(max_length=250, unique=True)
+
+    objects = TeamManager()
 
     def __str__(self):
         return self.name
@@ -51,13 +68,67 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+    # Remember loaded values so saves can tell which fields actually changed
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
     
+    # Principals loaded from the cache carry the session hash instead of the password
+    def get_session_auth_hash(self):
+        if hasattr(self, '_session_auth_hash'):
+            return self._session_auth_hash
+        return super().get_session_auth_hash()
+
+    # Only a password assigned since the user was loaded can be in clear
+    def _password_changed(self, update_fields):
+        if update_fields is not None and 'password' not in update_fields:
+            return False
+        if 'password' in self.get_deferred_fields():
+            return False
+        loaded = getattr(self, '_loaded_values', None)
+        return loaded is None or loaded.get('password') != self.password
+
     def save(self, *args, **kwargs):
-        if not self.team:
-            self.team = Team.objects.get_or_create(name="default_team")[0]
-        try:
-            identify_hasher(self.password) 
-        except ValueError:
-            self.set_password(self.password) 
+        if not self.team_id:
+            self.team = Team.objects.get_default()
+        if self._password_changed(kwargs.get('update_fields')):
+            try:
+                identify_hasher(self.password) 
+            except ValueError:
+                self.set_password(self.password) 
 
         super().save(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            name: getattr(self, name) for name in ('team_id', 'username', 'password') if name not in deferred
+        }
+
+
+# API tokens are random, so a single SHA-256 is enough to store them: only the
+# digest is kept and a request costs one hash and one indexed lookup
+def digest_token(key):
+    return hashlib.sha256(key.encode()).hexdigest()
+
+class AuthTokenManager(models.Manager):
+    # The plain key is only available on the returned instance, once
+    def issue(self, user, name=''):
+        key = secrets.token_urlsafe(32)
+        token = self.create(user=user, name=name, prefix=key[:8], digest=digest_token(key))
+        token.key = key
+        return token
+
+class AuthToken(models.Model):
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='auth_tokens')
+    name = models.CharField(max_length=100, blank=True)
+    # Start of the key, to tell tokens apart
+    prefix = models.CharField(max_length=8)
+    digest = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = AuthTokenManager()
+
+    def __str__(self):
+        return f"{self.prefix}... ({self.user})"
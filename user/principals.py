@@ -0,0 +1,63 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from .models import CustomUser
+
+# What authentication and the permission layer read from the user. Other fields
+# stay deferred and are only loaded if something actually touches them.
+PRINCIPAL_FIELDS = ('id', 'email', 'username', 'role', 'team_id', 'is_active', 'is_staff', 'is_superuser')
+PRINCIPAL_TIMEOUT = 60 * 60
+
+
+# Every save of a user bumps its version, which retires its cached principal.
+# Missing versions start from the clock so an evicted version is never reused.
+def _version_key(user_id):
+    return f'principal_version:{user_id}'
+
+
+def principal_version(user_id):
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns())
+        version = cache.get(key)
+    return version
+
+
+def _bump(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns())
+
+
+def bump_principals(user_ids):
+    keys = [_version_key(user_id) for user_id in user_ids]
+    _bump(keys)
+    # Again once the change is visible, so a request that cached the old row in between is retired
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def _build(data):
+    field_names = [field.attname for field in CustomUser._meta.concrete_fields if field.attname in PRINCIPAL_FIELDS]
+    user = CustomUser.from_db(CustomUser.objects.db, field_names, [data[name] for name in field_names])
+    # Sessions are verified against this hash, without loading the password
+    user._session_auth_hash = data['session_auth_hash']
+    return user
+
+
+# The user as a model instance with only the principal fields loaded, from the
+# shared cache when possible. None if the user does not exist.
+def get_principal(user_id):
+    cache_key = f'principal:{user_id}:{principal_version(user_id)}'
+    data = cache.get(cache_key)
+    if data is None:
+        user = CustomUser.objects.only(*PRINCIPAL_FIELDS, 'password').filter(pk=user_id).first()
+        if user is None:
+            return None
+        data = {name: getattr(user, name) for name in PRINCIPAL_FIELDS}
+        data['session_auth_hash'] = user.get_session_auth_hash()
+        cache.set(cache_key, data, PRINCIPAL_TIMEOUT)
+    return _build(data)
@@ -0,0 +1,156 @@
+import csv
+import json
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from post.feeds import backfill_team_feeds
+from .models import CustomUser, Team
+
+ROLES = {role for role, _ in CustomUser.ROLE_CHOICES}
+
+
+# Rows of a CSV or JSONL file, numbered from 1, read lazily
+def read_rows(path, format=None):
+    format = format or ('csv' if str(path).endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as file:
+        if format == 'csv':
+            for line, row in enumerate(csv.DictReader(file), start=2):
+                yield line, row
+        else:
+            for line, text in enumerate(file, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except ValueError:
+                    row = None
+                yield line, row if isinstance(row, dict) else None
+
+
+# Passwords that are already Django hashes are kept, others are hashed
+def hash_password(password):
+    if not password:
+        return make_password(None)
+    try:
+        identify_hasher(password)
+        return password
+    except ValueError:
+        return make_password(password)
+
+
+class Provisioner:
+    def __init__(self, workers=1):
+        # Existing teams are loaded once, new ones are added as rows name them
+        self.teams = dict(Team.objects.values_list('name', 'id'))
+        self.default_team_id = Team.objects.get_default().pk
+        self.seen_emails = set()
+        self.seen_usernames = set()
+        self.executor = ProcessPoolExecutor(workers, initializer=django.setup) if workers > 1 else None
+        self.created = 0
+        self.rejects = []
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+    def _reject(self, line, row, reason):
+        self.rejects.append({'line': line, 'email': (row or {}).get('email', ''), 'reason': reason})
+
+    def _validate(self, line, row):
+        if row is None:
+            return self._reject(line, row, "Malformed row.")
+        email = CustomUser.objects.normalize_email((row.get('email') or '').strip())
+        username = (row.get('username') or '').strip()
+        role = (row.get('role') or 'blogger').strip()
+        try:
+            validate_email(email)
+        except ValidationError:
+            return self._reject(line, row, "Invalid email.")
+        if not username:
+            return self._reject(line, row, "Missing username.")
+        if role not in ROLES:
+            return self._reject(line, row, "Invalid role.")
+        team = (row.get('team') or '').strip()
+        if len(team) > Team._meta.get_field('name').max_length:
+            return self._reject(line, row, "Team name too long.")
+        if email in self.seen_emails:
+            return self._reject(line, row, "Duplicate email in file.")
+        if username in self.seen_usernames:
+            return self._reject(line, row, "Duplicate username in file.")
+        self.seen_emails.add(email)
+        self.seen_usernames.add(username)
+        return {
+            'line': line, 'email': email, 'username': username, 'role': role,
+            'team': team, 'password': row.get('password') or '',
+        }
+
+    def _resolve_teams(self, names):
+        missing = {name for name in names if name and name not in self.teams}
+        if missing:
+            Team.objects.bulk_create([Team(name=name) for name in missing], ignore_conflicts=True)
+            self.teams.update(Team.objects.filter(name__in=missing).values_list('name', 'id'))
+
+    def _drop_existing(self, users):
+        emails = CustomUser.objects.filter(email__in=[user['email'] for user in users]).values_list('email', flat=True)
+        usernames = CustomUser.objects.filter(
+            username__in=[user['username'] for user in users]
+        ).values_list('username', flat=True)
+        emails, usernames = set(emails), set(usernames)
+        kept = []
+        for user in users:
+            if user['email'] in emails:
+                self._reject(user['line'], user, "Email already registered.")
+            elif user['username'] in usernames:
+                self._reject(user['line'], user, "Username already registered.")
+            else:
+                kept.append(user)
+        return kept
+
+    def _insert(self, users, passwords):
+        with transaction.atomic():
+            created = CustomUser.objects.bulk_create([
+                CustomUser(
+                    email=user['email'],
+                    username=user['username'],
+                    role=user['role'],
+                    team_id=self.teams[user['team']] if user['team'] else self.default_team_id,
+                    password=password,
+                )
+                for user, password in zip(users, passwords)
+            ])
+            # bulk_create sends no post_save: feeds are backfilled here, as on registration
+            members = defaultdict(list)
+            for user in created:
+                members[user.team_id].append(user.pk)
+            for team_id, user_ids in members.items():
+                backfill_team_feeds(team_id, user_ids)
+
+    # Validate, hash and insert one chunk of rows; returns the number of users created
+    def provision(self, rows):
+        users = [user for user in (self._validate(line, row) for line, row in rows) if user]
+        users = self._drop_existing(users)
+        if not users:
+            return 0
+        self._resolve_teams({user['team'] for user in users})
+
+        passwords = [user['password'] for user in users]
+        if self.executor is not None:
+            passwords = list(self.executor.map(hash_password, passwords, chunksize=max(1, len(passwords) // 64)))
+        else:
+            passwords = [hash_password(password) for password in passwords]
+
+        try:
+            self._insert(users, passwords)
+        except IntegrityError:
+            # Someone registered in the meantime: drop the taken rows and retry once
+            kept = {user['line'] for user in self._drop_existing(users)}
+            passwords = [password for user, password in zip(users, passwords) if user['line'] in kept]
+            users = [user for user in users if user['line'] in kept]
+            self._insert(users, passwords)
+        self.created += len(users)
+        return len(users)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import CustomUser as User
+from .models import AuthToken, CustomUser as User
 from django.contrib.auth.password_validation import validate_password
 
 class UserSerializer(serializers.ModelSerializer):
@@ -16,3 +16,19 @@ class UserSerializer(serializers.ModelSerializer):
         user.set_password(password)
         user.save()
         return user
+
+class AuthTokenSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuthToken
+        fields = ['id', 'name', 'prefix', 'created_at']
+        read_only_fields = ['prefix', 'created_at']
+
+    def create(self, validated_data):
+        return AuthToken.objects.issue(**validated_data)
+
+# Only returned when a token is issued or rotated, the key is not stored
+class IssuedAuthTokenSerializer(AuthTokenSerializer):
+    key = serializers.CharField(read_only=True)
+
+    class Meta(AuthTokenSerializer.Meta):
+        fields = AuthTokenSerializer.Meta.fields + ['key']
@@ -0,0 +1,32 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .authentication import forget_tokens
+from .models import DEFAULT_TEAM_CACHE_KEY, AuthToken, CustomUser, Team
+from .principals import bump_principals
+
+
+@receiver(post_delete, sender=AuthToken)
+def forget_revoked_token(sender, instance, **kwargs):
+    forget_tokens([instance.digest])
+
+
+# Retire the cached principal whenever the user changes
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def bump_principal_on_user_change(sender, instance, created=False, **kwargs):
+    if not created:
+        bump_principals([instance.pk])
+
+
+# Deleting a team nulls its members' team in bulk, which bypasses save()
+@receiver(pre_delete, sender=Team)
+def bump_principals_on_team_delete(sender, instance, **kwargs):
+    bump_principals(list(instance.users.values_list('id', flat=True)))
+
+
+# The cached default team is resolved again after any team is renamed or deleted
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+def forget_default_team(sender, **kwargs):
+    cache.delete(DEFAULT_TEAM_CACHE_KEY)
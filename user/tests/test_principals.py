@@ -0,0 +1,120 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from user.models import AuthToken, CustomUser as User, Team
+from post.models import Post
+from rest_framework import status
+
+
+def user_queries(queries):
+    return [
+        query['sql'] for query in queries.captured_queries
+        if 'FROM "user_customuser"' in query['sql'] or 'FROM "user_team"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestPrincipals:
+    def test_session_request_does_not_load_user(self, sessionClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", team_permission=1)
+        sessionClient.get("/api/posts/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = sessionClient.get("/api/posts/")
+            assert response.status_code == status.HTTP_200_OK
+            response = sessionClient.get(f"/api/posts/{post.id}/")
+            assert response.status_code == status.HTTP_200_OK
+        assert user_queries(queries) == []
+
+    def test_token_request_does_not_load_user(self, teamAUser):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AuthToken.objects.issue(teamAUser).key}")
+        client.get("/api/posts/")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get("/api/posts/")
+        assert response.status_code == status.HTTP_200_OK
+        assert user_queries(queries) == []
+
+    def test_team_change_is_seen(self, sessionClient, teamAUser, teamBUser):
+        post = Post.objects.create(author=teamBUser, title="Title", content="Content", team_permission=1)
+        response = sessionClient.get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        teamAUser.team = teamBUser.team
+        teamAUser.save()
+        response = sessionClient.get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_role_change_is_seen(self, sessionClient, teamAUser, teamBUser):
+        post = Post.objects.create(author=teamBUser, title="Title", content="Content", team_permission=1)
+        response = sessionClient.get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+        teamAUser.role = 'admin'
+        teamAUser.save()
+        response = sessionClient.get(f"/api/posts/{post.id}/")
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_team_delete_is_seen(self, sessionClient, teamAUser):
+        post = Post.objects.create(author=teamAUser, title="Title", content="Content", team_permission=1)
+        response = sessionClient.get("/api/posts/")
+        assert response.data['count'] == 1
+
+        teamAUser.team.delete()
+        author = User.objects.create_user(email="new@email.com", username="new", password="new")
+        Post.objects.create(author=author, title="Title", content="Content", team_permission=1)
+        # Both users have no team now, which does not make them teammates
+        response = sessionClient.get("/api/posts/")
+        assert [result['id'] for result in response.data['results']] == [post.id]
+
+    def test_deactivated_user_is_logged_out(self, sessionClient, teamAUser):
+        response = sessionClient.post("/api/posts/", data={"title": "Title", "content": "Content"})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        teamAUser.is_active = False
+        teamAUser.save()
+        response = sessionClient.post("/api/posts/", data={"title": "Title", "content": "Content"})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_password_change_ends_session(self, sessionClient, teamAUser):
+        assert sessionClient.post("/api/tokens/").status_code == status.HTTP_201_CREATED
+
+        teamAUser.set_password("changed")
+        teamAUser.save()
+        assert sessionClient.post("/api/tokens/").status_code == status.HTTP_403_FORBIDDEN
+
+    def test_write_with_principal(self, sessionClient, teamAUser):
+        response = sessionClient.post("/api/posts/", data={"title": "Title", "content": "Content"})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Post.objects.get(id=response.data['id']).author == teamAUser
+        teamAUser.refresh_from_db()
+        assert teamAUser.check_password("tau")
+
+
+@pytest.fixture
+def teamAUser(db):
+    team,_ = Team.objects.get_or_create(name="Team A")
+    return User.objects.create_user(
+        email="tau@email.com",
+        username="tau",
+        password="tau",
+        team = team
+    )
+
+@pytest.fixture
+def sessionClient(teamAUser):
+    client = APIClient(enforce_csrf_checks=False)
+    assert client.login(email="tau@email.com", password="tau")
+    return client
+
+@pytest.fixture
+def teamBUser(db):
+    team,_ = Team.objects.get_or_create(name="Team B")
+    return User.objects.create_user(
+        email="tbu@email.com",
+        username="tbu",
+        password="tbu",
+        team = team
+    )
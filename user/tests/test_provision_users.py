@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from post.models import FeedEntry, Post
+from user.models import CustomUser as User, Team
+
+# Hashed once, so the tests do not pay the hasher for every row
+HASHED = make_password("hashed_password")
+
+
+def write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return path
+
+
+@pytest.mark.django_db
+class TestProvisionUsers:
+    def test_provision_from_csv(self, tmp_path):
+        Team.objects.create(name="Team A")
+        path = tmp_path / "users.csv"
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=['email', 'username', 'password', 'team', 'role'])
+            writer.writeheader()
+            writer.writerow({'email': 'a@email.com', 'username': 'a', 'password': HASHED, 'team': 'Team A'})
+            writer.writerow({'email': 'b@email.com', 'username': 'b', 'password': 'plain', 'team': 'Team B'})
+            writer.writerow({'email': 'c@email.com', 'username': 'c', 'password': HASHED, 'role': 'admin'})
+
+        call_command('provision_users', str(path), '--workers', '1', stdout=io.StringIO())
+
+        assert User.objects.count() == 3
+        a, b, c = User.objects.order_by('email')
+        assert a.team.name == "Team A"
+        assert b.team.name == "Team B"
+        assert c.team.name == "default_team"
+        assert c.role == 'admin'
+        assert a.check_password("hashed_password")
+        assert b.check_password("plain")
+        assert Team.objects.filter(name="Team A").count() == 1
+
+    def test_provision_from_jsonl_with_rejects(self, tmp_path):
+        User.objects.create_user(email="taken@email.com", username="taken", password="taken")
+        path = write_jsonl(tmp_path / "users.jsonl", [
+            {'email': 'ok@email.com', 'username': 'ok', 'password': HASHED},
+            {'email': 'taken@email.com', 'username': 'other', 'password': HASHED},
+            {'email': 'new@email.com', 'username': 'taken', 'password': HASHED},
+            {'email': 'ok@email.com', 'username': 'again', 'password': HASHED},
+            {'email': 'not an email', 'username': 'bad', 'password': HASHED},
+            {'email': 'role@email.com', 'username': 'role', 'password': HASHED, 'role': 'owner'},
+            {'email': 'nouser@email.com', 'password': HASHED},
+        ])
+        (tmp_path / "users.jsonl").write_text(path.read_text() + "{not json\n")
+        rejects = tmp_path / "rejects.csv"
+        output = io.StringIO()
+
+        call_command(
+            'provision_users', str(path), '--workers', '1', '--chunk-size', '3', '--rejects', str(rejects),
+            stdout=output,
+        )
+
+        assert "Created 1 users, rejected 7 rows." in output.getvalue()
+        assert set(User.objects.values_list('username', flat=True)) == {'taken', 'ok'}
+        with open(rejects) as file:
+            reasons = {int(row['line']): row['reason'] for row in csv.DictReader(file)}
+        assert reasons == {
+            2: "Email already registered.",
+            3: "Username already registered.",
+            4: "Duplicate email in file.",
+            5: "Invalid email.",
+            6: "Invalid role.",
+            7: "Missing username.",
+            8: "Malformed row.",
+        }
+
+    def test_provision_with_process_pool(self, tmp_path):
+        path = write_jsonl(tmp_path / "users.jsonl", [
+            {'email': f'user{i}@email.com', 'username': f'user{i}', 'password': f'password{i}', 'team': f'Team {i % 2}'}
+            for i in range(4)
+        ])
+
+        call_command('provision_users', str(path), '--workers', '2', '--chunk-size', '2', stdout=io.StringIO())
+
+        assert User.objects.count() == 4
+        assert Team.objects.filter(name__startswith="Team ").count() == 2
+        user = User.objects.get(username='user3')
+        assert user.team.name == "Team 1"
+        assert user.check_password("password3")
+
+    def test_provisioned_users_get_team_feeds(self, tmp_path):
+        author = User.objects.create_user(
+            email="author@email.com", username="author", password="author", team=Team.objects.create(name="Team A"),
+        )
+        post = Post.objects.create(author=author, title="Team", content="Content", team_permission=1)
+        Post.objects.create(author=author, title="Private", content="Content")
+        path = write_jsonl(tmp_path / "users.jsonl", [
+            {'email': 'a@email.com', 'username': 'a', 'password': HASHED, 'team': 'Team A'},
+            {'email': 'b@email.com', 'username': 'b', 'password': HASHED, 'team': 'Team B'},
+        ])
+
+        call_command('provision_users', str(path), '--workers', '1', stdout=io.StringIO())
+
+        assert list(FeedEntry.objects.filter(user__username='a').values_list('post_id', flat=True)) == [post.pk]
+        assert not FeedEntry.objects.filter(user__username='b').exists()
@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from user.models import CustomUser as User, Team
+from rest_framework import status
+
+REGISTRATIONS = 5
+
+
+def register(client, i):
+    return client.post("/api/register/", data={
+        "email": f"user{i}@email.com",
+        "username": f"user{i}",
+        "password": "test_password",
+    })
+
+
+@pytest.mark.django_db
+class TestRegisterBenchmark:
+    # Email and username uniqueness, the insert, then the default team's recent posts
+    # for the new user's feed: the default team comes from the cache
+    def test_registration_queries(self):
+        client = APIClient()
+        register(client, 0)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = register(client, 1)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['team_name'] == "default_team"
+        assert len(queries) == 4
+        assert not any('"user_team"' in query['sql'] for query in queries.captured_queries)
+
+    # Hashing dominates the cost of a registration: it happens once per user
+    def test_registration_hashes_once(self, monkeypatch):
+        client = APIClient()
+        hashed = []
+
+        def counting_make_password(password, *args, **kwargs):
+            hashed.append(password)
+            return make_password(password, *args, **kwargs)
+        monkeypatch.setattr('django.contrib.auth.base_user.make_password', counting_make_password)
+        for i in range(REGISTRATIONS):
+            assert register(client, i).status_code == status.HTTP_201_CREATED
+        assert hashed == ["test_password"] * REGISTRATIONS
+
+        default_team = Team.objects.get(name="default_team")
+        assert User.objects.filter(team=default_team).count() == REGISTRATIONS
+
+    def test_profile_update_skips_hasher(self, monkeypatch):
+        user = User.objects.create_user(email="test@email.com", username="test", password="test_password")
+        user = User.objects.get(id=user.id)
+
+        def fail(password):
+            raise AssertionError("identify_hasher called")
+        monkeypatch.setattr('user.models.identify_hasher', fail)
+        user.username = "renamed"
+        user.save()
+
+    def test_password_assigned_in_clear_is_hashed(self):
+        user = User.objects.create_user(email="test@email.com", username="test", password="test_password")
+        user = User.objects.get(id=user.id)
+        user.password = "new_password"
+        user.save()
+
+        user.refresh_from_db()
+        identify_hasher(user.password)
+        assert user.check_password("new_password")
+
+    def test_team_names_are_unique(self):
+        Team.objects.create(name="Team A")
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Team.objects.create(name="Team A")
+
+    def test_deleted_default_team_is_recreated(self):
+        first = User.objects.create_user(email="a@email.com", username="a", password="a")
+        first.team.delete()
+
+        second = User.objects.create_user(email="b@email.com", username="b", password="b")
+        assert Team.objects.filter(id=second.team_id, name="default_team").exists()
@@ -1,6 +1,10 @@
-from .views import RegisterAPIView
+from .views import AuthTokenViewSet, RegisterAPIView
 from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+router = DefaultRouter()
+router.register(r'tokens', AuthTokenViewSet)
 
 urlpatterns = [
     path('register/', RegisterAPIView.as_view(), name="register")  
-] 
\ No newline at end of file
+] + router.urls
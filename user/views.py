@@ -1,9 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import mixins, status
+from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
-from .models import CustomUser as User
-from .serializers import UserSerializer
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.viewsets import GenericViewSet
+from django.db import transaction
+from .models import AuthToken, CustomUser as User
+from .serializers import AuthTokenSerializer, IssuedAuthTokenSerializer, UserSerializer
 from rest_framework.generics import CreateAPIView
 
 class RegisterAPIView(CreateAPIView):
@@ -14,3 +18,31 @@ class RegisterAPIView(CreateAPIView):
         if request.user.is_authenticated:
             raise PermissionDenied("You are already registered.")
         return super().post(request, *args, **kwargs)
+
+
+# Issue, list, rotate and revoke the API tokens of the current user
+class AuthTokenViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.DestroyModelMixin, GenericViewSet):
+    queryset = AuthToken.objects.all()
+    serializer_class = AuthTokenSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return AuthToken.objects.filter(user=self.request.user).order_by('-created_at', '-id')
+
+    def get_serializer_class(self):
+        if self.action in ('create', 'rotate'):
+            return IssuedAuthTokenSerializer
+        return AuthTokenSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    # Replace the key of a token, the old key stops working immediately
+    @action(detail=True, methods=['post'])
+    def rotate(self, request, pk=None):
+        token = self.get_object()
+        with transaction.atomic():
+            rotated = AuthToken.objects.issue(user=token.user, name=token.name)
+            token.delete()
+        return Response(self.get_serializer(rotated).data, status=status.HTTP_201_CREATED)